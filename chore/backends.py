@@ -0,0 +1,221 @@
+import json
+import re
+from collections import namedtuple
+
+# The text of a chat completion together with its token usage and HTTP response headers
+Completion = namedtuple("Completion", ["content", "usage", "headers"])
+
+
+class BackendError(Exception):
+    """
+    Raised by a backend when a request fails.
+
+    Args:
+        message (str): The error message.
+        status_code (int | None): The HTTP status code, or None for connection errors and timeouts.
+        headers (Mapping[str, str] | None): The HTTP response headers, if any.
+    """
+
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def retryable(self):
+        # Rate limits, server errors and connection problems may succeed on a later attempt
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class TranslationBackend:
+    """
+    Sends chat completion requests for translate.py.
+
+    Implementations must be safe to call from several threads at once.
+    """
+
+    name = None
+
+    def complete(self, messages, **options):
+        """
+        Sends one chat completion request.
+
+        Args:
+            messages (list[dict]): The chat messages.
+            **options: Extra request options such as `response_format`.
+
+        Returns:
+            Completion: The completion.
+
+        Raises:
+            BackendError: If the request fails.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OpenAICompatibleBackend(TranslationBackend):
+    """
+    Backend for OpenAI and any server that implements the OpenAI chat completions API (vLLM, Ollama's /v1, ...).
+
+    A single client is shared by all workers, so its keep-alive connection pool is reused across requests.
+    """
+
+    name = "openai"
+
+    def __init__(self, model, api_key=None, base_url=None, max_connections=8, timeout=600):
+        import httpx
+        from openai import DefaultHttpxClient, OpenAI
+
+        if not api_key:
+            if not base_url:
+                raise EnvironmentError("Please set the TEXTCRAFT_API_KEY in your environment variables.")
+            # Local servers usually don't check the key, but the client requires one
+            api_key = "unused"
+
+        self.model = model
+        # Retries are handled by translate.py so that every worker shares the same rate limiter
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url or None,
+            max_retries=0,
+            timeout=timeout,
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            ),
+        )
+
+    def complete(self, messages, **options):
+        from openai import APIConnectionError, APIStatusError
+
+        try:
+            raw_response = self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                **options,
+            )
+        except APIStatusError as e:
+            raise BackendError(str(e), e.status_code, e.response.headers) from e
+        except APIConnectionError as e:
+            raise BackendError(str(e)) from e
+
+        response = raw_response.parse()
+        usage = {}
+        if response.usage is not None:
+            details = getattr(response.usage, "prompt_tokens_details", None)
+            usage = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+            }
+        return Completion(response.choices[0].message.content, usage, raw_response.headers)
+
+    def close(self):
+        self.client.close()
+
+
+class OllamaBackend(TranslationBackend):
+    """
+    Backend for the native Ollama chat API (`/api/chat`), which supports JSON-schema structured output
+    and keeps the model loaded between requests.
+    """
+
+    name = "ollama"
+
+    def __init__(self, model, base_url="http://localhost:11434", max_connections=8, timeout=600, keep_alive="10m"):
+        import httpx
+
+        self.model = model
+        self.keep_alive = keep_alive
+        # One pooled client keeps the HTTP connections to the Ollama server alive across requests
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def complete(self, messages, **options):
+        import httpx
+
+        body = {"model": self.model, "messages": messages, "stream": False, "keep_alive": self.keep_alive}
+        response_format = options.get("response_format")
+        if response_format and response_format.get("type") == "json_schema":
+            body["format"] = response_format["json_schema"]["schema"]
+
+        try:
+            response = self.client.post("/api/chat", json=body)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise BackendError(e.response.text, e.response.status_code, e.response.headers) from e
+        except httpx.TransportError as e:
+            raise BackendError(str(e)) from e
+
+        data = response.json()
+        usage = {
+            "prompt_tokens": data.get("prompt_eval_count", 0),
+            "completion_tokens": data.get("eval_count", 0),
+            "cached_tokens": 0,
+        }
+        return Completion(data["message"]["content"], usage, response.headers)
+
+    def close(self):
+        self.client.close()
+
+
+class StubBackend(TranslationBackend):
+    """
+    Deterministic in-process backend for tests and offline runs.
+
+    Every text is "translated" by prefixing it with the target language, e.g. "[Japanese] Hello",
+    in whichever request format translate.py used.
+    """
+
+    name = "stub"
+
+    def complete(self, messages, **options):
+        prompt = messages[-1]["content"]
+        language_match = re.search(r"Target language: '([^']*)'", prompt)
+        prefix = f"[{language_match.group(1) if language_match else 'stub'}] "
+
+        if "response_format" in options:
+            texts = json.loads(prompt.split("\n\n", 1)[1])
+            # Adaptation requests send {"source": ..., "translation": ...} objects; their source is translated again
+            content = json.dumps(
+                {text_id: prefix + (text["source"] if isinstance(text, dict) else text) for text_id, text in texts.items()},
+                ensure_ascii=False,
+            )
+        else:
+            numbered = prompt.split("\n\n", 1)[1].rsplit("\n\nTarget language:", 1)[0]
+            content = re.sub(r"^(\d+)\. ", lambda match: f"{match.group(0)}{prefix}", numbered, flags=re.MULTILINE)
+
+        usage = {
+            "prompt_tokens": sum(len(message["content"]) for message in messages) // 4,
+            "completion_tokens": len(content) // 4,
+            "cached_tokens": 0,
+        }
+        return Completion(content, usage, {})
+
+
+def create_backend(name, model, api_key=None, base_url=None, max_connections=8):
+    """
+    Creates a translation backend by name.
+
+    Args:
+        name (str): "openai", "ollama" or "stub".
+        model (str): The model name.
+        api_key (str | None): The API key for the OpenAI-compatible backend.
+        base_url (str | None): The server URL; each backend has its own default.
+        max_connections (int): The size of the HTTP connection pool.
+
+    Returns:
+        TranslationBackend: The backend.
+    """
+    if name == "openai":
+        return OpenAICompatibleBackend(model, api_key=api_key, base_url=base_url, max_connections=max_connections)
+    if name == "ollama":
+        return OllamaBackend(model, base_url=base_url or "http://localhost:11434", max_connections=max_connections)
+    if name == "stub":
+        return StubBackend()
+    raise ValueError(f"Unknown translation backend '{name}'.")
@@ -0,0 +1,411 @@
+import argparse
+import builtins
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import resx
+from rate_limit import RateLimiter
+
+# Where the results of a reference run are kept for regression checks
+BASELINE_PATH = "benchmark_baseline.json"
+
+# Counters that must not grow at all, and the relative (plus a small absolute) slack allowed for wall time
+EXACT_METRICS = ["requests", "tokens_sent", "xml_parses", "file_reads", "file_writes", "file_replaces", "files_deleted"]
+DEFAULT_TIME_TOLERANCE = 0.5
+MIN_TIME_SLACK_S = 0.1
+
+CSPROJ_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" DefaultTargets="Build" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+{items}
+  </ItemGroup>
+</Project>
+"""
+
+LONG_PROMPT = (
+    "You are an AI assistant embedded in a word processor. Respond to the user's request using the document as context.\n"
+    "Keep the tone of the document and never invent facts that are not supported by it.\n"
+    "If the request is ambiguous, explain which interpretation you chose in a single sentence.\n"
+    "Format the answer as Markdown, using headings, lists and tables only where they make the answer easier to read.\n"
+    "Reply in the language of the document unless the user asks otherwise. Document: {0}"
+)
+
+
+class MockCompletionServer:
+    """
+    Local OpenAI-compatible chat completions server that echoes every text back as its translation.
+
+    Args:
+        latency (float): Seconds to wait before answering each request.
+        failure_rate (float): Fraction of requests answered with a 429 or 500 error.
+        seed (int): Seed for the failure decisions, so runs are repeatable.
+    """
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.tokens_sent = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "failures": self.failures, "tokens_sent": self.tokens_sent}
+
+    def reply(self, body):
+        prompt = body["messages"][-1]["content"]
+        if "response_format" in body:
+            return prompt.split("\n\n", 1)[1]
+        return prompt.split("\n\n", 1)[1].rsplit("\n\nTarget language:", 1)[0]
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+                with mock.lock:
+                    mock.requests += 1
+                    mock.tokens_sent += prompt_tokens
+                    failed = mock.random.random() < mock.failure_rate
+                    if failed:
+                        mock.failures += 1
+                time.sleep(mock.latency)
+
+                if failed:
+                    status = 429 if mock.random.random() < 0.5 else 500
+                    self._send(status, {"error": {"message": "Injected failure", "type": "mock"}}, {"retry-after": "0.1"})
+                    return
+
+                content = mock.reply(body)
+                self._send(200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": prompt_tokens + len(content) // 4,
+                    },
+                })
+
+        return Handler
+
+
+def is_project_file(path):
+    """
+    Returns:
+        bool: Whether the path is a RESX or csproj file, or the ".tmp" file it is written through.
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        return False
+    path = os.fspath(path)
+    if path.endswith(".tmp"):
+        path = path[:-len(".tmp")]
+    return path.endswith((".resx", ".csproj"))
+
+
+class IOCounter:
+    """
+    Counts XML parses, reads, writes and replacements of RESX and csproj files, and RESX deletions while active, by
+    wrapping the ElementTree, open and os functions.
+
+    Files opened for reading include the ones ElementTree parses. Writes count ElementTree writes to file objects,
+    such as the temporary files of resx.write_resx_atomic, and files opened for writing, such as the csproj; state
+    files such as the manifest and the translation journal are left out.
+    """
+
+    def __init__(self):
+        self.xml_parses = 0
+        self.file_reads = 0
+        self.file_writes = 0
+        self.file_replaces = 0
+        self.files_deleted = 0
+        self.lock = threading.Lock()
+
+    def _increment(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _count(self, name, function):
+        def wrapper(*args, **kwargs):
+            self._increment(name)
+            return function(*args, **kwargs)
+        return wrapper
+
+    def _count_project_file_opens(self, function):
+        def wrapper(file, mode="r", *args, **kwargs):
+            if is_project_file(file):
+                self._increment("file_reads" if not any(flag in mode for flag in "wax+") else "file_writes")
+            return function(file, mode, *args, **kwargs)
+        return wrapper
+
+    def _count_project_file_replaces(self, function):
+        def wrapper(source, destination, *args, **kwargs):
+            if is_project_file(destination):
+                self._increment("file_replaces")
+            return function(source, destination, *args, **kwargs)
+        return wrapper
+
+    def _count_resx_deletions(self, function):
+        # Only deleted RESX files count; state files such as the translation journal come and go with every run
+        def wrapper(path, *args, **kwargs):
+            if str(path).endswith(".resx"):
+                self._increment("files_deleted")
+            return function(path, *args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.originals = (ET.parse, ET.fromstring, ET.ElementTree.write, builtins.open, os.replace, os.remove)
+        ET.parse = self._count("xml_parses", ET.parse)
+        ET.fromstring = self._count("xml_parses", ET.fromstring)
+        ET.ElementTree.write = self._count("file_writes", ET.ElementTree.write)
+        builtins.open = self._count_project_file_opens(builtins.open)
+        os.replace = self._count_project_file_replaces(os.replace)
+        os.remove = self._count_resx_deletions(os.remove)
+        return self
+
+    def __exit__(self, *exc_info):
+        ET.parse, ET.fromstring, ET.ElementTree.write, builtins.open, os.replace, os.remove = self.originals
+
+
+def generate_corpus(root_dir, file_count, key_count):
+    """
+    Writes synthetic neutral RESX files and a csproj that references them.
+
+    Every tenth key is a long multi-line prompt, every seventh key shares its text with another file,
+    and some keys contain `{0}` placeholders, mirroring the real resource files.
+
+    Args:
+        root_dir (str): The directory that stands in for the repository root.
+        file_count (int): The number of neutral RESX files.
+        key_count (int): The number of keys per file.
+
+    Returns:
+        dict[str, list[str]]: The synthetic `resource_files` mapping.
+    """
+    synthetic_resource_files = {}
+    items = []
+    for file_index in range(file_count):
+        base_name = f"Synthetic{file_index}"
+        values = {}
+        for key_index in range(key_count):
+            key = f"[Synthetic{file_index}] Key{key_index}.Text"
+            if key_index % 10 == 9:
+                values[key] = f"{LONG_PROMPT}\nVariant {file_index}-{key_index}."
+            elif key_index % 7 == 0:
+                values[key] = f"Shared label {key_index}"
+            elif key_index % 5 == 0:
+                values[key] = f"Value {{0}} of file {file_index}, key {key_index}"
+            else:
+                values[key] = f"Button label {file_index}-{key_index}"
+
+        root = resx.new_resx_root()
+        resx.set_resx_values(root, values)
+        resx.write_resx_atomic(root, os.path.join(root_dir, f"{base_name}.resx"))
+        synthetic_resource_files[base_name] = list(values)
+        items.append(
+            f'    <EmbeddedResource Include="{base_name}.resx">\n'
+            f"      <DependentUpon>{base_name}.cs</DependentUpon>\n"
+            f"    </EmbeddedResource>"
+        )
+
+    with open(os.path.join(root_dir, "TextCraft.csproj"), "w", encoding="utf-8") as csproj_file:
+        csproj_file.write(CSPROJ_TEMPLATE.format(items="\n".join(items)))
+    return synthetic_resource_files
+
+
+def run_benchmark(file_count, key_count, language_count, latency, failure_rate):
+    """
+    Runs every phase of the localization pipeline against a synthetic corpus and a mock completion server.
+
+    Returns:
+        dict[str, dict[str, float]]: The metrics of every phase.
+    """
+    work_dir = tempfile.mkdtemp(prefix="textcraft-benchmark-")
+    chore_dir = os.path.join(work_dir, "chore")
+    os.mkdir(chore_dir)
+    previous_dir = os.getcwd()
+    results = {}
+
+    try:
+        synthetic_resource_files = generate_corpus(work_dir, file_count, key_count)
+        # translate.py resolves the repository root as "../" and keeps its state files in the working directory
+        os.chdir(chore_dir)
+        import delete
+        import translate
+
+        translate.resource_files = synthetic_resource_files
+        translate.language_mapping = dict(list(translate.language_mapping.items())[:language_count])
+        translate.rate_limiter = RateLimiter(1_000_000, 1_000_000_000)
+        translate.MAX_RETRIES = 10
+
+        with MockCompletionServer(latency, failure_rate) as server:
+            translate.TRANSLATION_BACKEND = "openai"
+            translate.BACKEND_ENDPOINT = server.url
+            translate.API_KEY = "benchmark"
+            translate.backend = None
+
+            def measure(phase, function):
+                before = server.snapshot()
+                with IOCounter() as counter:
+                    start = time.perf_counter()
+                    function()
+                    wall_time = time.perf_counter() - start
+                after = server.snapshot()
+                results[phase] = {
+                    "wall_time_s": round(wall_time, 3),
+                    "requests": after["requests"] - before["requests"],
+                    "failed_requests": after["failures"] - before["failures"],
+                    "tokens_sent": after["tokens_sent"] - before["tokens_sent"],
+                    "xml_parses": counter.xml_parses,
+                    "file_reads": counter.file_reads,
+                    "file_writes": counter.file_writes,
+                    "file_replaces": counter.file_replaces,
+                    "files_deleted": counter.files_deleted,
+                }
+
+            def prune():
+                for base_name in synthetic_resource_files:
+                    delete.delete_localized_resx_files(work_dir, base_name)
+
+            # The pipeline prints a line per file; keep the report readable
+            with open(os.devnull, "w") as devnull:
+                stdout = sys.stdout
+                sys.stdout = devnull
+                try:
+                    measure("translate", translate.generate_resx_files)
+                    measure("translate (no changes)", translate.generate_resx_files)
+                    measure("sync-csproj", translate.add_resx_to_csproj)
+                    measure("prune", prune)
+                finally:
+                    sys.stdout = stdout
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare_with_baseline(results, baseline, time_tolerance):
+    """
+    Lists every metric that got worse than the baseline.
+
+    Returns:
+        list[str]: One message per regression.
+    """
+    regressions = []
+    for phase, metrics in results.items():
+        reference = baseline.get(phase)
+        if reference is None:
+            continue
+        for metric in EXACT_METRICS:
+            if metric in reference and metrics[metric] > reference[metric]:
+                regressions.append(f"{phase}: {metric} {reference[metric]} -> {metrics[metric]}")
+        allowed_time = max(reference["wall_time_s"] * (1 + time_tolerance), reference["wall_time_s"] + MIN_TIME_SLACK_S)
+        if metrics["wall_time_s"] > allowed_time:
+            regressions.append(f"{phase}: wall_time_s {reference['wall_time_s']} -> {metrics['wall_time_s']}")
+    return regressions
+
+
+def print_report(results):
+    columns = ["wall_time_s", "requests", "failed_requests", "tokens_sent", "xml_parses", "file_reads", "file_writes", "file_replaces", "files_deleted"]
+    print(f"{'phase':<24}" + "".join(f"{column:>17}" for column in columns))
+    for phase, metrics in results.items():
+        print(f"{phase:<24}" + "".join(f"{metrics[column]:>17}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the localization pipeline against a mock completion server.")
+    parser.add_argument("--files", type=int, default=5, help="number of synthetic neutral RESX files")
+    parser.add_argument("--keys", type=int, default=25, help="number of keys per file")
+    parser.add_argument("--languages", type=int, default=10, help="number of target languages")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency per request in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 429/500")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE, help="allowed relative wall time increase")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    config = {
+        "files": args.files,
+        "keys": args.keys,
+        "languages": args.languages,
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+    }
+    results = run_benchmark(args.files, args.keys, args.languages, args.latency, args.failure_rate)
+
+    if args.json:
+        print(json.dumps({"config": config, "results": results}, indent=2))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"config": config, "results": results}, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Saved baseline to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["config"] != config:
+        print("Skipping the baseline comparison because it was recorded with a different configuration.")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline["results"], args.time_tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import os
+import re
+
+# One <EmbeddedResource Include="..."> item, self-closing or with children, including its indentation and line break.
+# Other attributes such as Condition or LogicalName may come before or after Include.
+EMBEDDED_RESOURCE_PATTERN = re.compile(
+    r'^([ \t]*)<EmbeddedResource\s+(?:[^>]*?\s)?Include="([^"]+)"[^>]*?(?:/>|>.*?</EmbeddedResource>)[ \t]*(?:\r?\n)?',
+    re.MULTILINE | re.DOTALL,
+)
+CHILD_INDENT_PATTERN = re.compile(r"\n([ \t]*)<DependentUpon>")
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def find_embedded_resources(text):
+    """
+    Finds the EmbeddedResource items of a project file.
+
+    Returns:
+        list[tuple[str, int, int]]: (include, start, end) per item, where text[start:end] covers its whole lines.
+    """
+    return [(match.group(2), match.start(), match.end()) for match in EMBEDDED_RESOURCE_PATTERN.finditer(text)]
+
+
+def plan_csproj_sync(included, resx_file_names, resource_files, language_codes, excluded_language_codes=()):
+    """
+    Computes which localized RESX files have to be added to or removed from a project.
+
+    Args:
+        included (Iterable[str]): The Include values of the project's EmbeddedResource items.
+        resx_file_names (set[str]): The RESX files that exist next to the project.
+        resource_files (Iterable[str]): The base names of the localized resource files (e.g., "AboutBox").
+        language_codes (Iterable[str]): The language codes that should be included.
+        excluded_language_codes (Iterable[str]): Language codes whose items are removed even while their files exist.
+
+    Returns:
+        tuple[list[str], list[str]]: The sorted file names to add, and the sorted file names to remove.
+    """
+    included = set(included)
+    resource_files = set(resource_files)
+    expected = {f"{resource_file}.{code}.resx" for resource_file in resource_files for code in language_codes}
+    excluded = {f"{resource_file}.{code}.resx" for resource_file in resource_files for code in excluded_language_codes}
+    to_add = sorted((expected & resx_file_names) - included - excluded, key=str.lower)
+
+    # Only the localized items ("{resource_file}.{code}.resx") of our resource files are managed;
+    # everything else in the project is left alone
+    to_remove = sorted(
+        (
+            include for include in included
+            if include.endswith(".resx") and include.count(".") >= 2
+            and include.partition(".")[0] in resource_files
+            and (include not in resx_file_names or include in excluded)
+        ),
+        key=str.lower,
+    )
+    return to_add, to_remove
+
+
+def render_embedded_resource(include, indent, child_indent, newline):
+    dependent_upon = f"{include.partition('.')[0]}.cs"
+    return (
+        f'{indent}<EmbeddedResource Include="{include}">{newline}'
+        f"{child_indent}<DependentUpon>{dependent_upon}</DependentUpon>{newline}"
+        f"{indent}</EmbeddedResource>{newline}"
+    )
+
+
+def apply_csproj_sync(text, to_add, to_remove):
+    """
+    Adds and removes EmbeddedResource items in the project text, leaving every other byte untouched.
+
+    New items are inserted in alphabetical order among the existing ones and copy their indentation
+    and line endings, so the diff only shows the items that changed.
+
+    Returns:
+        str: The updated project text.
+    """
+    newline = "\r\n" if "\r\n" in text else "\n"
+    resources = find_embedded_resources(text)
+    removals = set(to_remove)
+    kept = [(include, start, end) for include, start, end in resources if include not in removals]
+
+    edits = [(start, end, "") for include, start, end in resources if include in removals]
+    if to_add:
+        if kept:
+            first_include, first_start, first_end = kept[0]
+            item_text = text[first_start:first_end]
+            indent = item_text[:len(item_text) - len(item_text.lstrip(" \t"))]
+            child_match = CHILD_INDENT_PATTERN.search(item_text)
+            child_indent = child_match.group(1) if child_match else indent + "  "
+
+            # Insert each new item next to the localized items of the same resource file, right after the one that
+            # directly precedes it alphabetically. The neutral items often live in another ItemGroup, and items
+            # added by hand may be out of order, so neither the file order nor the neutral items are used.
+            insertions = {}
+            for include in to_add:
+                base_name = include.partition(".")[0]
+                siblings = [
+                    item for item in kept
+                    if item[0].partition(".")[0] == base_name and item[0].count(".") >= 2
+                ] or kept
+                preceding = [item for item in siblings if item[0].lower() < include.lower()]
+                if preceding:
+                    position = max(preceding, key=lambda item: item[0].lower())[2]
+                else:
+                    position = min(siblings, key=lambda item: item[0].lower())[1]
+                insertions.setdefault(position, []).append(render_embedded_resource(include, indent, child_indent, newline))
+            edits.extend((position, position, "".join(items)) for position, items in insertions.items())
+        else:
+            # The project has no resources yet, so they get their own ItemGroup
+            position = text.rindex("</Project>")
+            items = "".join(render_embedded_resource(include, "    ", "      ", newline) for include in to_add)
+            edits.append((position, position, f"  <ItemGroup>{newline}{items}  </ItemGroup>{newline}"))
+
+    # Apply from the end so that earlier offsets stay valid
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1]), reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def sync_csproj(csproj_path, resx_directory, resource_files, language_codes, dry_run=False, excluded_language_codes=()):
+    """
+    Brings the localized EmbeddedResource items of a project in line with the RESX files on disk.
+
+    The project file is only rewritten when items have to be added or removed, so unchanged runs keep
+    its modification time and don't trigger an MSBuild re-evaluation.
+
+    Args:
+        csproj_path (str): The path to the .csproj file.
+        resx_directory (str): The directory containing the RESX files.
+        resource_files (Iterable[str]): The base names of the localized resource files (e.g., "AboutBox").
+        language_codes (Iterable[str]): The language codes that should be included.
+        dry_run (bool): Only compute the changes.
+        excluded_language_codes (Iterable[str]): Language codes whose items are removed even while their files exist.
+
+    Returns:
+        tuple[list[str], list[str]]: The file names added and removed.
+    """
+    with open(csproj_path, "rb") as csproj_file:
+        data = csproj_file.read()
+    has_bom = data.startswith(UTF8_BOM)
+    text = data[len(UTF8_BOM):].decode("utf-8") if has_bom else data.decode("utf-8")
+
+    with os.scandir(resx_directory) as entries:
+        resx_file_names = {entry.name for entry in entries if entry.name.endswith(".resx") and entry.is_file()}
+    included = [include for include, _, _ in find_embedded_resources(text)]
+    to_add, to_remove = plan_csproj_sync(included, resx_file_names, list(resource_files), list(language_codes), list(excluded_language_codes))
+    if dry_run or not (to_add or to_remove):
+        return to_add, to_remove
+
+    updated = apply_csproj_sync(text, to_add, to_remove).encode("utf-8")
+    temp_path = f"{csproj_path}.tmp"
+    with open(temp_path, "wb") as csproj_file:
+        csproj_file.write((UTF8_BOM if has_bom else b"") + updated)
+    os.replace(temp_path, csproj_path)
+    return to_add, to_remove
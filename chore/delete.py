@@ -1,41 +1,149 @@
+import argparse
 import os
-import fnmatch
 
-def delete_localized_resx_files(directory, base_file_name):
+from resx import load_resx_root, remove_resx_values, write_resx_atomic
+from translation_memory import hash_text
+
+
+def find_localized_resx_files(directory, base_file_names):
     """
-    Deletes all .resx files in the specified directory that start with the base_file_name
-    but excludes the language-neutral one (e.g., AboutBox.resx).
-    
+    Finds the localized .resx files of several base names in a single directory scan,
+    excluding the language-neutral ones (e.g., AboutBox.resx).
+
     Args:
         directory (str): The path to the directory containing the .resx files.
-        base_file_name (str): The base file name to match (e.g., "AboutBox").
+        base_file_names (Iterable[str]): The base file names to match (e.g., ["AboutBox", "Forge"]).
+
+    Returns:
+        dict[str, dict[str, str]]: Base name -> language code -> file path.
+    """
+    found = {base_file_name: {} for base_file_name in base_file_names}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Localized files are named "{base_file_name}.{code}.resx" (e.g., AboutBox.ar.resx, AboutBox.sr-Cyrl-BA.resx)
+            if not entry.name.endswith(".resx") or not entry.is_file():
+                continue
+            base_file_name, _, code = entry.name[:-len(".resx")].partition(".")
+            if code and base_file_name in found:
+                found[base_file_name][code] = entry.path
+    return found
+
+
+def delete_all_localized_resx_files(directory, base_file_names, language_codes=None, dry_run=False):
+    """
+    Deletes the localized .resx files of several base names, scanning the directory once.
+
+    Args:
+        directory (str): The path to the directory containing the .resx files.
+        base_file_names (Iterable[str]): The base file names to match (e.g., ["AboutBox", "Forge"]).
+        language_codes (list[str] | None): Only delete the files of these language codes (e.g., ["ja", "fr-FR"]).
+        dry_run (bool): Only print what would be deleted.
     """
     if not os.path.isdir(directory):
         print(f"Error: The specified directory '{directory}' does not exist.")
         return
-    
-    # Pattern to match localized .resx files (e.g., AboutBox.ar.resx, AboutBox.fr.resx, etc.)
-    localized_pattern = f"{base_file_name}.*.resx"
-    language_neutral_file = f"{base_file_name}.resx"
-    
-    # Iterate through the files in the directory
-    for file_name in os.listdir(directory):
-        file_path = os.path.join(directory, file_name)
-        
-        # Check if the file matches the localized pattern but is not the language-neutral file
-        if fnmatch.fnmatch(file_name, localized_pattern) and file_name != language_neutral_file:
+
+    for localized_files in find_localized_resx_files(directory, base_file_names).values():
+        for code, file_path in sorted(localized_files.items()):
+            if language_codes is not None and code not in language_codes:
+                continue
+            if dry_run:
+                print(f"Would delete: {file_path}")
+                continue
             try:
                 os.remove(file_path)
                 print(f"Deleted: {file_path}")
             except OSError as e:
                 print(f"Error deleting file {file_path}: {e}")
-    
+
     print("Localized .resx file deletion completed.")
 
-# Example usage
-directory_path = "../"
-delete_localized_resx_files(directory_path, "AboutBox")
-delete_localized_resx_files(directory_path, "Forge")
-delete_localized_resx_files(directory_path, "GenerateUserControl")
-delete_localized_resx_files(directory_path, "RAGControl")
-delete_localized_resx_files(directory_path, "PasswordPrompt")
\ No newline at end of file
+
+def delete_localized_resx_files(directory, base_file_name, language_codes=None, dry_run=False):
+    """
+    Deletes all .resx files in the specified directory that start with the base_file_name
+    but excludes the language-neutral one (e.g., AboutBox.resx).
+
+    Args:
+        directory (str): The path to the directory containing the .resx files.
+        base_file_name (str): The base file name to match (e.g., "AboutBox").
+        language_codes (list[str] | None): Only delete the files of these language codes (e.g., ["ja", "fr-FR"]).
+        dry_run (bool): Only print what would be deleted.
+    """
+    delete_all_localized_resx_files(directory, [base_file_name], language_codes, dry_run)
+
+
+def prune_localized_resx_files(directory, source_values, manifest, language_codes=None, dry_run=False):
+    """
+    Removes only the outdated <data> entries from the localized .resx files, keeping every valid translation.
+
+    An entry is outdated if its key is no longer translatable in the neutral file, or if the manifest shows
+    it was translated from a different source text. Each affected file is rewritten once, and the removed
+    keys are dropped from the manifest so that the next translation run picks them up again.
+
+    Args:
+        directory (str): The path to the directory containing the .resx files.
+        source_values (Mapping[str, Mapping[str, str]]): Base name -> translatable key -> neutral text.
+        manifest (dict): The translation manifest (base name -> code -> key -> source-text hash); updated in place.
+        language_codes (list[str] | None): Only prune the files of these language codes (e.g., ["ja", "fr-FR"]).
+        dry_run (bool): Only print what would be removed.
+
+    Returns:
+        dict[tuple[str, str], list[str]]: (base name, code) -> removed keys.
+    """
+    if not os.path.isdir(directory):
+        print(f"Error: The specified directory '{directory}' does not exist.")
+        return {}
+
+    pruned = {}
+    for base_file_name, localized_files in find_localized_resx_files(directory, source_values).items():
+        values = source_values[base_file_name]
+        current_hashes = {key: hash_text(value) for key, value in values.items()}
+
+        for code, file_path in sorted(localized_files.items()):
+            if language_codes is not None and code not in language_codes:
+                continue
+            manifest_hashes = manifest.get(base_file_name, {}).get(code, {})
+            root = load_resx_root(file_path)
+            outdated = []
+            for data in root.findall("data"):
+                key = data.attrib.get("name")
+                # Dropped from the neutral file, or translated from a text that has since changed
+                if key not in current_hashes or manifest_hashes.get(key, current_hashes[key]) != current_hashes[key]:
+                    outdated.append(key)
+            if not outdated:
+                continue
+
+            pruned[(base_file_name, code)] = outdated
+            if dry_run:
+                print(f"Would remove {len(outdated)} entries from {file_path}: {', '.join(outdated)}")
+                continue
+            remove_resx_values(root, outdated)
+            try:
+                write_resx_atomic(root, file_path)
+                print(f"Removed {len(outdated)} entries from {file_path}")
+            except OSError as e:
+                print(f"Error saving file {file_path}: {e}")
+                continue
+            for key in outdated:
+                manifest_hashes.pop(key, None)
+
+    print(f"Localized .resx pruning completed: {sum(len(keys) for keys in pruned.values())} entries in {len(pruned)} files.")
+    return pruned
+
+
+if __name__ == "__main__":
+    import translate
+
+    parser = argparse.ArgumentParser(description="Remove outdated translations from the localized .resx files.")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would be removed")
+    parser.add_argument("--whole-files", action="store_true", help="delete the localized files entirely instead of pruning entries")
+    args = parser.parse_args()
+
+    directory_path = "../"
+    if translate.KEY_DISCOVERY:
+        translate.apply_key_discovery()
+    if args.whole_files:
+        delete_all_localized_resx_files(directory_path, translate.resource_files, dry_run=args.dry_run)
+    else:
+        translate.prune_translations(dry_run=args.dry_run)
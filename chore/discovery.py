@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# Bump to invalidate existing index files when the scanners change
+INDEX_VERSION = 1
+
+# C# comments and string literals, in the order they have to be tried; verbatim strings escape quotes as ""
+CSHARP_TOKEN_PATTERN = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?\*/'
+    r'|(?:\$@|@\$|@)"((?:[^"]|"")*)"'
+    r'|\$?"((?:[^"\\\n]|\\.)*)"'
+    r"|'(?:[^'\\\n]|\\.)+'",
+    re.DOTALL,
+)
+# Lookups nested in interpolated strings are hidden from the token scan, so they are matched on their own
+LOOKUP_PATTERN = re.compile(r'GetLocalizedString\(\s*"((?:[^"\\\n]|\\.)*)"')
+COMPONENT_RESOURCE_MANAGER_PATTERN = re.compile(r"new\s+(?:System\.ComponentModel\.)?ComponentResourceManager\(\s*typeof\(\s*(\w+)\s*\)\s*\)")
+APPLY_RESOURCES_PATTERN = re.compile(r'\.ApplyResources\(\s*[^,]+,\s*"([^"]+)"\s*\)')
+# Runtime assignments such as `this.labelProductName.Text = AssemblyProduct;` replace the designer value
+PROPERTY_ASSIGNMENT_PATTERN = re.compile(r"(?<![\w.])(?:this\.)?((?:\w+\.)?\w+)\s*=(?!=)")
+ESCAPE_SEQUENCES = {"n": "\n", "r": "\r", "t": "\t", "0": "\0"}
+
+
+def unescape_csharp(text):
+    return re.sub(r"\\(.)", lambda match: ESCAPE_SEQUENCES.get(match.group(1), match.group(1)), text)
+
+
+def scan_source(text):
+    """
+    Extracts everything key discovery needs from one C# source file.
+
+    Returns:
+        dict: "literals" (every string literal, including GetLocalizedString keys), "components"
+            (ComponentResourceManager type -> ApplyResources prefixes) and "assignments" (assigned
+            members such as "labelVersion.Text", or "Text" for the form itself).
+    """
+    literals = set()
+    for match in CSHARP_TOKEN_PATTERN.finditer(text):
+        if match.group(1) is not None:
+            literals.add(match.group(1).replace('""', '"'))
+        elif match.group(2) is not None:
+            literals.add(unescape_csharp(match.group(2)))
+    literals.update(unescape_csharp(key) for key in LOOKUP_PATTERN.findall(text))
+
+    components = {}
+    prefixes = APPLY_RESOURCES_PATTERN.findall(text)
+    for component in COMPONENT_RESOURCE_MANAGER_PATTERN.findall(text):
+        components.setdefault(component, [])
+        components[component].extend(prefix for prefix in prefixes if prefix not in components[component])
+
+    # Strip literals and comments first so that "=" inside them isn't taken for an assignment
+    code = CSHARP_TOKEN_PATTERN.sub('""', text)
+    assignments = sorted(set(PROPERTY_ASSIGNMENT_PATTERN.findall(code)))
+    return {"literals": sorted(literals), "components": components, "assignments": assignments}
+
+
+def read_translatable_keys(path):
+    """
+    Lists the keys of a neutral RESX file that hold translatable text: plain strings with at least one letter,
+    excluding typed values (sizes, icons, ...) and designer metadata (">>" keys).
+
+    Returns:
+        list[str]: The keys, in file order.
+    """
+    keys = []
+    for data in ET.parse(path).getroot().findall("data"):
+        name = data.attrib.get("name", "")
+        value = data.find("value")
+        if name.startswith(">>") or "type" in data.attrib or "mimetype" in data.attrib:
+            continue
+        if value is not None and value.text and any(character.isalpha() for character in value.text):
+            keys.append(name)
+    return keys
+
+
+def build_key_index(base_dir, cache_path=None, update_cache=True):
+    """
+    Indexes the C# sources and neutral RESX files of a directory, reusing the cached entries of unchanged files.
+
+    A file is rescanned only when its modification time or size differ from the cached ones.
+
+    Args:
+        base_dir (str): The project directory.
+        cache_path (str | None): The JSON file the index is cached in; no caching when None.
+        update_cache (bool): Write the changed entries back to cache_path; otherwise it is only read.
+
+    Returns:
+        dict: "sources" (file name -> scan_source result) and "resx" (base name -> translatable keys).
+    """
+    cached = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as cache_file:
+            index_data = json.load(cache_file)
+        if index_data.get("version") == INDEX_VERSION:
+            cached = index_data["files"]
+
+    files = {}
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            is_source = entry.name.endswith(".cs")
+            # Neutral files have no culture part, e.g. Forge.resx but not Forge.ja.resx
+            is_neutral_resx = entry.name.endswith(".resx") and entry.name.count(".") == 1
+            if not (is_source or is_neutral_resx) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            previous = cached.get(entry.name)
+            if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+                files[entry.name] = previous
+                continue
+            if is_source:
+                with open(entry.path, encoding="utf-8-sig") as source_file:
+                    data = scan_source(source_file.read())
+            else:
+                data = read_translatable_keys(entry.path)
+            files[entry.name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "data": data}
+
+    if cache_path and update_cache and files != cached:
+        temp_path = f"{cache_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"version": INDEX_VERSION, "files": files}, cache_file, indent=1, sort_keys=True, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+
+    return {
+        "sources": {name: entry["data"] for name, entry in files.items() if name.endswith(".cs")},
+        "resx": {name[:-len(".resx")]: entry["data"] for name, entry in files.items() if name.endswith(".resx")},
+    }
+
+
+def discover_keys(index):
+    """
+    Finds the translatable keys of every neutral RESX file that the C# code actually uses.
+
+    A key is used if it appears as a string literal (GetLocalizedString lookups, key lists), or if the designer
+    of its form applies it through ComponentResourceManager.ApplyResources and no code of the form overwrites
+    that property at runtime.
+
+    Returns:
+        dict[str, list[str]]: Base name -> used keys, in RESX file order.
+    """
+    literals = set()
+    applied_prefixes = {}
+    overwritten = {}
+    for name, scan in index["sources"].items():
+        literals.update(scan["literals"])
+        for component, prefixes in scan["components"].items():
+            applied_prefixes.setdefault(component, set()).update(prefixes)
+        # Designer files set the resources; the form's own code may then replace them
+        if not name.endswith(".Designer.cs"):
+            component = name.split(".")[0]
+            overwritten.setdefault(component, set()).update(scan["assignments"])
+
+    used = {}
+    for base_name, keys in index["resx"].items():
+        prefixes = applied_prefixes.get(base_name, set())
+        assignments = overwritten.get(base_name, set())
+        used[base_name] = []
+        for key in keys:
+            control, _, member = key.rpartition(".")
+            # "$this" is the form itself, which its code assigns as `this.Text = ...`
+            assigned_as = member if control == "$this" else key
+            if key in literals or (control in prefixes and assigned_as not in assignments):
+                used[base_name].append(key)
+    return used
+
+
+def compare_with_listed_keys(index, used, listed):
+    """
+    Compares the discovered keys with a hand-maintained list.
+
+    Args:
+        index (dict): The result of build_key_index.
+        used (Mapping[str, list[str]]): The result of discover_keys.
+        listed (Mapping[str, list[str]]): Base name -> listed keys, like translate.resource_files.
+
+    Returns:
+        dict[str, dict[str, list[str]]]: Base name -> "unused" (listed but never referenced or not translatable
+            in the neutral file), "unlisted" (referenced but not listed) and "unreferenced" (translatable in
+            the neutral file but never referenced).
+    """
+    report = {}
+    for base_name, listed_keys in listed.items():
+        used_keys = set(used.get(base_name, []))
+        report[base_name] = {
+            "unused": [key for key in listed_keys if key not in used_keys],
+            "unlisted": [key for key in used.get(base_name, []) if key not in listed_keys],
+            "unreferenced": [key for key in index["resx"].get(base_name, []) if key not in used_keys],
+        }
+    return report
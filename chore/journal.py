@@ -0,0 +1,65 @@
+import json
+import os
+
+
+class RunJournal:
+    """
+    Append-only JSON Lines journal of the localized files a translation run has finished.
+
+    Every entry is flushed and synced to disk before the run moves on, so a crashed or interrupted run
+    leaves a record of exactly which files are done.
+
+    Args:
+        path (str): The path to the journal file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """
+        Reads the entries of the journal. A truncated last line, left by a crash mid-write, is ignored.
+
+        Returns:
+            list[dict]: The entries, oldest first.
+        """
+        if not self.exists():
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return entries
+
+    def append(self, entry):
+        """
+        Appends one entry and syncs it to disk.
+
+        Args:
+            entry (dict): A JSON-serializable entry.
+        """
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def clear(self):
+        """
+        Closes and deletes the journal, once its entries are safely recorded elsewhere.
+        """
+        self.close()
+        if self.exists():
+            os.remove(self.path)
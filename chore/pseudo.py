@@ -0,0 +1,55 @@
+import math
+
+from verify import PLACEHOLDER_PATTERN
+
+# The Windows pseudo-locales: accented and padded text, and the same text mirrored right-to-left
+PSEUDO_LOCALE = "qps-ploc"
+MIRRORED_PSEUDO_LOCALE = "qps-plocm"
+
+ACCENTED_CHARACTERS = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "åƀçđéƒĝĥîĵķļɱñöþǫŕšţûṽŵẋýžÅƁÇĐÉƑĜĤÎĴĶĻṀÑÖÞǪŔŠŢÛṼŴẊÝŽ",
+)
+# Appended to reach the padded length; accented so that it stands out as filler
+PADDING_TEXT = " ļöŕéɱ îþšûɱ đöļöŕ šîţ åɱéţ çöñšéçţéţûŕ åđîþîšçîñĝ éļîţ"
+
+# Unicode right-to-left override and pop directional formatting
+RIGHT_TO_LEFT_OVERRIDE = "\u202e"
+POP_DIRECTIONAL_FORMATTING = "\u202c"
+
+
+def pseudo_localize(text, padding=0.3, mirror=False):
+    """
+    Turns a text into a pseudo-translation that is still readable but exposes layout and encoding problems,
+    e.g. "Save {0}?" -> "[Šåṽé {0}? ļö]".
+
+    Letters are accented, the text is padded and wrapped in bracket markers, and with mirror=True every line
+    is rendered right-to-left. Format placeholders such as {0} and the line structure are left intact.
+
+    Args:
+        text (str): The neutral text.
+        padding (float): The fraction of the text length to add, e.g. 0.3 for 30% longer text.
+        mirror (bool): Whether to render every line right-to-left.
+
+    Returns:
+        str: The pseudo-translation.
+    """
+    # Accent everything except the placeholders
+    parts = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        parts.append(text[position:match.start()].translate(ACCENTED_CHARACTERS))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(text[position:].translate(ACCENTED_CHARACTERS))
+    pseudo_text = "".join(parts)
+
+    padding_length = math.ceil(len(text.replace("\n", "")) * padding)
+    filler = (PADDING_TEXT * (padding_length // len(PADDING_TEXT) + 1))[:padding_length]
+    pseudo_text = f"[{pseudo_text}{filler}]"
+
+    if mirror:
+        pseudo_text = "\n".join(
+            f"{RIGHT_TO_LEFT_OVERRIDE}{line}{POP_DIRECTIONAL_FORMATTING}" for line in pseudo_text.split("\n")
+        )
+    return pseudo_text
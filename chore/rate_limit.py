@@ -0,0 +1,156 @@
+import random
+import re
+import threading
+import time
+
+
+def parse_reset_duration(value):
+    """
+    Parses an OpenAI rate-limit reset header (e.g. "1s", "6m0s", "20ms") into seconds.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        float | None: The duration in seconds, or None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value):
+        matched = True
+        amount = float(amount)
+        if unit == "ms":
+            total += amount / 1000
+        elif unit == "s":
+            total += amount
+        elif unit == "m":
+            total += amount * 60
+        elif unit == "h":
+            total += amount * 3600
+    return total if matched else None
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """
+    Computes how long to sleep before the next retry using exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The zero-based retry attempt.
+        base (float): The delay of the first attempt in seconds.
+        cap (float): The maximum delay in seconds.
+        retry_after (float | None): A server-provided delay that takes precedence when present.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    if retry_after is not None:
+        # Add a little jitter so concurrent workers don't wake up in lockstep
+        return min(cap, retry_after) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimiter:
+    """
+    Thread-safe requests-per-minute and tokens-per-minute budget shared by all translation workers.
+
+    Both budgets refill continuously. The limiter also honors the `x-ratelimit-*` and `retry-after`
+    response headers, pausing every worker until the server-reported reset when a budget is exhausted.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._available_requests = float(requests_per_minute)
+        self._available_tokens = float(tokens_per_minute)
+        self._last_refill = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._available_requests = min(
+            self.requests_per_minute,
+            self._available_requests + elapsed * self.requests_per_minute / 60,
+        )
+        self._available_tokens = min(
+            self.tokens_per_minute,
+            self._available_tokens + elapsed * self.tokens_per_minute / 60,
+        )
+
+    def acquire(self, tokens):
+        """
+        Blocks until one request and `tokens` tokens fit in the budgets, then consumes them.
+
+        Args:
+            tokens (int): The estimated number of tokens the request will use.
+        """
+        # A single request larger than the whole budget would otherwise wait forever
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    missing_requests = 1 - self._available_requests
+                    missing_tokens = tokens - self._available_tokens
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        self._available_requests -= 1
+                        self._available_tokens -= tokens
+                        return
+                    wait = max(
+                        missing_requests * 60 / self.requests_per_minute,
+                        missing_tokens * 60 / self.tokens_per_minute,
+                    )
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops all workers from sending requests for the given number of seconds.
+
+        Args:
+            seconds (float): The pause duration.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def update_from_headers(self, headers):
+        """
+        Synchronizes the local budgets with the rate-limit headers returned by the server.
+
+        Args:
+            headers (Mapping[str, str]): The HTTP response headers.
+        """
+        if not headers:
+            return
+
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        reset_requests = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+        reset_tokens = parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+
+        with self._lock:
+            self._refill(self._clock())
+            try:
+                if remaining_requests is not None:
+                    self._available_requests = min(self._available_requests, float(remaining_requests))
+                if remaining_tokens is not None:
+                    self._available_tokens = min(self._available_tokens, float(remaining_tokens))
+            except ValueError:
+                return
+
+        # The server budget is exhausted; hold everyone until it resets
+        if remaining_requests is not None and float(remaining_requests) <= 0 and reset_requests:
+            self.pause(reset_requests)
+        if remaining_tokens is not None and float(remaining_tokens) <= 0 and reset_tokens:
+            self.pause(reset_tokens)
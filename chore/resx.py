@@ -0,0 +1,192 @@
+import os
+import stat
+import tempfile
+import xml.etree.ElementTree as ET
+
+# Base XML template
+RESX_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<root>
+  <xsd:schema id="root" xmlns="" xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:msdata="urn:schemas-microsoft-com:xml-msdata">
+    <xsd:import namespace="http://www.w3.org/XML/1998/namespace" />
+    <xsd:element name="root" msdata:IsDataSet="true">
+      <xsd:complexType>
+        <xsd:choice maxOccurs="unbounded">
+          <xsd:element name="metadata">
+            <xsd:complexType>
+              <xsd:sequence>
+                <xsd:element name="value" type="xsd:string" minOccurs="0" />
+              </xsd:sequence>
+              <xsd:attribute name="name" use="required" type="xsd:string" />
+              <xsd:attribute name="type" type="xsd:string" />
+              <xsd:attribute name="mimetype" type="xsd:string" />
+              <xsd:attribute ref="xml:space" />
+            </xsd:complexType>
+          </xsd:element>
+          <xsd:element name="assembly">
+            <xsd:complexType>
+              <xsd:attribute name="alias" type="xsd:string" />
+              <xsd:attribute name="name" type="xsd:string" />
+            </xsd:complexType>
+          </xsd:element>
+          <xsd:element name="data">
+            <xsd:complexType>
+              <xsd:sequence>
+                <xsd:element name="value" type="xsd:string" minOccurs="0" msdata:Ordinal="1" />
+                <xsd:element name="comment" type="xsd:string" minOccurs="0" msdata:Ordinal="2" />
+              </xsd:sequence>
+              <xsd:attribute name="name" type="xsd:string" use="required" msdata:Ordinal="1" />
+              <xsd:attribute name="type" type="xsd:string" msdata:Ordinal="3" />
+              <xsd:attribute name="mimetype" type="xsd:string" msdata:Ordinal="4" />
+              <xsd:attribute ref="xml:space" />
+            </xsd:complexType>
+          </xsd:element>
+          <xsd:element name="resheader">
+            <xsd:complexType>
+              <xsd:sequence>
+                <xsd:element name="value" type="xsd:string" minOccurs="0" msdata:Ordinal="1" />
+              </xsd:sequence>
+              <xsd:attribute name="name" type="xsd:string" use="required" />
+            </xsd:complexType>
+          </xsd:element>
+        </xsd:choice>
+      </xsd:complexType>
+    </xsd:element>
+  </xsd:schema>
+  <resheader name="resmimetype">
+    <value>text/microsoft-resx</value>
+  </resheader>
+  <resheader name="version">
+    <value>2.0</value>
+  </resheader>
+  <resheader name="reader">
+    <value>System.Resources.ResXResourceReader, System.Windows.Forms, Version=4.0.0.0, Culture=neutral, PublicKeyToken=b77a5c561934e089</value>
+  </resheader>
+  <resheader name="writer">
+    <value>System.Resources.ResXResourceWriter, System.Windows.Forms, Version=4.0.0.0, Culture=neutral, PublicKeyToken=b77a5c561934e089</value>
+  </resheader>
+</root>
+"""
+
+
+# Mode of newly created files, as open() would create them. os.umask can only be read by setting it, so it is read
+# once at import rather than while worker threads may be creating files.
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+
+
+def new_resx_root():
+    """
+    Returns a fresh root element built from RESX_TEMPLATE.
+
+    A new tree is parsed on every call, so elements are never shared (and moved) between files.
+    """
+    return ET.fromstring(RESX_TEMPLATE)
+
+
+def load_resx_root(path):
+    """
+    Loads a RESX file, or a fresh template root if the file does not exist yet.
+
+    Args:
+        path (str): The path to the RESX file.
+
+    Returns:
+        xml.etree.ElementTree.Element: The root element.
+    """
+    if os.path.exists(path):
+        return ET.parse(path).getroot()
+    return new_resx_root()
+
+
+def read_resx_values(path, keys=None):
+    """
+    Reads the `<data>` values of a RESX file.
+
+    Args:
+        path (str): The path to the RESX file.
+        keys (Collection[str] | None): Only return these keys when given.
+
+    Returns:
+        dict[str, str]: The value of every non-empty entry, in file order.
+    """
+    values = {}
+    for data in ET.parse(path).getroot().findall("data"):
+        name = data.attrib.get("name")
+        if keys is not None and name not in keys:
+            continue
+        value = data.find("value")
+        if value is not None and value.text:
+            values[name] = value.text
+    return values
+
+
+def set_resx_values(root, values):
+    """
+    Inserts or updates several `<data>` entries of a RESX root in memory.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The RESX root element.
+        values (Mapping[str, str]): The new value of every key.
+
+    Returns:
+        int: The number of entries that were added or changed.
+    """
+    existing = {data.attrib.get("name"): data for data in root.findall("data")}
+    changed = 0
+    for key, text in values.items():
+        data = existing.get(key)
+        if data is None:
+            data = ET.SubElement(root, "data", {"name": key})
+            existing[key] = data
+        value = data.find("value")
+        if value is None:
+            value = ET.SubElement(data, "value")
+        if value.text != text:
+            value.text = text
+            changed += 1
+    return changed
+
+
+def write_resx_atomic(root, path):
+    """
+    Writes a RESX root to disk through a temporary file and a rename, so readers never see a partial file.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The RESX root element.
+        path (str): The destination path.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".resx-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            ET.ElementTree(root).write(temp_file, encoding="utf-8", xml_declaration=True)
+        # mkstemp creates the file as 0600; keep the mode of the file being replaced, or use the usual one for new files
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def remove_resx_values(root, keys):
+    """
+    Removes several `<data>` entries from a RESX root in memory.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The RESX root element.
+        keys (Collection[str]): The keys to remove.
+
+    Returns:
+        int: The number of entries that were removed.
+    """
+    removed = 0
+    for data in root.findall("data"):
+        if data.attrib.get("name") in keys:
+            root.remove(data)
+            removed += 1
+    return removed
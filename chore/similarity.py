@@ -0,0 +1,228 @@
+import base64
+import functools
+import hashlib
+import json
+import os
+import struct
+from collections import Counter
+
+# Bump to invalidate existing index files when the hashing or the banding changes
+INDEX_VERSION = 1
+
+# Texts are compared by their sets of overlapping character n-grams
+SHINGLE_LENGTH = 3
+# Shorter texts are neither indexed nor looked up; a few characters carry too little context to borrow from
+MIN_TEXT_LENGTH = 12
+
+# MinHash signatures use one-permutation hashing: every shingle hash lands in one of the bins by its low bits and
+# each bin keeps its smallest value, so a signature costs a single hash per shingle.
+SIGNATURE_SIZE = 64
+BIN_BITS = 6
+# Bins left empty by short texts borrow the value of the next filled bin, offset by the distance
+EMPTY_BIN = 1 << 64
+BORROWED_OFFSET = 1 << (64 - BIN_BITS)
+HASH_MASK = (1 << 64) - 1
+
+# Locality-sensitive hashing: texts become candidates when all rows of any band agree. With 21 bands of 3 rows a pair
+# with a Jaccard similarity of 0.5 is found 94% of the time, one of 0.2 only 16% of the time.
+BAND_ROWS = 3
+BAND_COUNT = SIGNATURE_SIZE // BAND_ROWS
+# The rows of a band are folded into one 64-bit key, FNV style; a rare collision only adds a candidate to verify
+BAND_KEY_PRIME = 0x100000001B3
+# Candidates whose exact similarity is computed, after ranking them by the number of bands they share
+VERIFIED_CANDIDATES = 8
+
+
+def shingles(text):
+    """
+    Returns:
+        set[str]: The overlapping character n-grams of the text.
+    """
+    return {text[i:i + SHINGLE_LENGTH] for i in range(len(text) - SHINGLE_LENGTH + 1)}
+
+
+def jaccard_similarity(first, second):
+    """
+    Returns:
+        float: The Jaccard similarity of the two sets, between 0 and 1.
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def shingle_hash(shingle):
+    """
+    Returns:
+        int: A 64-bit hash of the shingle. Unlike Python's string hash it is the same in every process, so saved
+            indexes stay valid; the same shingles recur across texts, so the recent ones are cached.
+    """
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(text_shingles):
+    """
+    Computes the one-permutation MinHash signature of a set of shingles.
+
+    Returns:
+        tuple[int, ...] | None: The signature, or None for an empty set.
+    """
+    if not text_shingles:
+        return None
+    bins = [EMPTY_BIN] * SIGNATURE_SIZE
+    bin_mask = SIGNATURE_SIZE - 1
+    for shingle in text_shingles:
+        hash_value = shingle_hash(shingle)
+        bin_index = hash_value & bin_mask
+        value = hash_value >> BIN_BITS
+        if value < bins[bin_index]:
+            bins[bin_index] = value
+
+    if EMPTY_BIN not in bins:
+        return tuple(bins)
+    # Walk right to left twice around, so that every empty bin has passed the next filled bin to its right
+    signature = list(bins)
+    next_value = None
+    distance = 0
+    for step in range(2 * SIGNATURE_SIZE - 1, -1, -1):
+        bin_index = step % SIGNATURE_SIZE
+        if bins[bin_index] != EMPTY_BIN:
+            next_value = bins[bin_index]
+            distance = 0
+            continue
+        distance += 1
+        if next_value is not None:
+            signature[bin_index] = next_value + distance * BORROWED_OFFSET
+    return tuple(signature)
+
+
+def band_keys(signature):
+    """
+    Returns:
+        list[int]: One key per band, equal for two signatures whose rows in that band agree.
+    """
+    keys = []
+    for band in range(BAND_COUNT):
+        key = band
+        for value in signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]:
+            key = ((key ^ value) * BAND_KEY_PRIME) & HASH_MASK
+        keys.append(key)
+    return keys
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index for finding the known texts most similar to a new one, which can be saved to a file.
+
+    A lookup hashes the text once per shingle and only scores the texts that share a band with it, so it
+    stays well under a millisecond for typical strings even with tens of thousands of indexed texts.
+
+    Args:
+        texts (Iterable[str]): The texts to index.
+    """
+
+    def __init__(self, texts=()):
+        self.texts = []
+        self.buckets = {}
+        self.positions = {}
+        # The band keys of every text, in the order of self.texts, so the index can be saved without rehashing
+        self.text_band_keys = []
+        for text in texts:
+            self.add(text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text):
+        """
+        Adds a text to the index. Duplicates and texts shorter than MIN_TEXT_LENGTH are ignored.
+        """
+        if len(text) < MIN_TEXT_LENGTH or text in self.positions:
+            return
+        self._insert(text, band_keys(minhash_signature(shingles(text))))
+
+    def _insert(self, text, keys):
+        position = len(self.texts)
+        self.texts.append(text)
+        self.positions[text] = position
+        self.text_band_keys.extend(keys)
+        for band_key in keys:
+            self.buckets.setdefault(band_key, []).append(position)
+
+    def query(self, text, limit=3, min_similarity=0.0):
+        """
+        Finds the indexed texts most similar to the given one, not counting the text itself.
+
+        Args:
+            text (str): The text to look up.
+            limit (int): The maximum number of matches to return.
+            min_similarity (float): The minimum Jaccard similarity of the character n-grams.
+
+        Returns:
+            list[tuple[str, float]]: Pairs of (indexed text, similarity), most similar first.
+        """
+        if len(text) < MIN_TEXT_LENGTH:
+            return []
+        text_shingles = shingles(text)
+        signature = minhash_signature(text_shingles)
+
+        # Texts sharing more bands are likelier to be similar; compute the exact similarity of the best candidates only
+        band_matches = Counter()
+        for band_key in band_keys(signature):
+            band_matches.update(self.buckets.get(band_key, ()))
+        band_matches.pop(self.positions.get(text), None)
+        matches = []
+        for position, _ in band_matches.most_common(max(limit, VERIFIED_CANDIDATES)):
+            similarity = jaccard_similarity(text_shingles, shingles(self.texts[position]))
+            if similarity >= min_similarity:
+                matches.append((self.texts[position], similarity))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
+
+    def save(self, path, state):
+        """
+        Writes the index to a JSON file, replacing it atomically.
+
+        Args:
+            path (str): The file to write.
+            state (dict): JSON-serializable details of what was indexed, returned by load to tell whether the index
+                is still current.
+        """
+        packed_keys = struct.pack(f"<{len(self.text_band_keys)}Q", *self.text_band_keys)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "state": state,
+                    "texts": self.texts,
+                    "band_keys": base64.b64encode(packed_keys).decode("ascii"),
+                },
+                index_file,
+                ensure_ascii=False,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save.
+
+        Returns:
+            tuple[SimilarityIndex, dict] | None: The index and the state it was saved with, or None when the file
+                doesn't exist or was written by another INDEX_VERSION.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as index_file:
+            data = json.load(index_file)
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        index = cls()
+        texts = data["texts"]
+        keys = struct.unpack(f"<{len(texts) * BAND_COUNT}Q", base64.b64decode(data["band_keys"]))
+        for position, text in enumerate(texts):
+            index._insert(text, keys[position * BAND_COUNT:(position + 1) * BAND_COUNT])
+        return index, data["state"]
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+
+# USD per million tokens as (input, cached input, output); models that aren't listed are reported at zero cost
+MODEL_PRICES_PER_MILLION = {
+    "gpt-4o-mini-2024-07-18": (0.15, 0.075, 0.60),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o-2024-08-06": (2.50, 1.25, 10.00),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+METRIC_PREFIX = "textcraft_translate"
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Estimates the cost of a request in USD.
+
+    Args:
+        model (str): The model name.
+        prompt_tokens (int): The number of input tokens, including cached ones.
+        completion_tokens (int): The number of output tokens.
+        cached_tokens (int): The number of input tokens served from the prompt cache.
+
+    Returns:
+        float: The estimated cost in USD.
+    """
+    input_price, cached_price, output_price = MODEL_PRICES_PER_MILLION.get(model, (0, 0, 0))
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+class RunTelemetry:
+    """
+    Thread-safe collector of per-language and per-file statistics for one translation run.
+
+    Args:
+        model (str): The model used for the run, for cost estimates.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.finished_at = None
+            self.languages = {}
+            self.files_written = {}
+            self.resource_file_shares = {}
+
+    def _language(self, language):
+        return self.languages.setdefault(language, {
+            "requests": 0,
+            "retries": 0,
+            "failed_requests": 0,
+            "parse_failures": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+            "request_seconds": 0.0,
+            "latency_seconds": 0.0,
+            "texts": 0,
+            "translated_texts": 0,
+        })
+
+    def record_request(self, language, seconds, usage, retries, ok=True):
+        """
+        Records one request, including the time spent in its retries.
+
+        Args:
+            language (str): The target language.
+            seconds (float): The time from the first attempt to the final response.
+            usage (Mapping[str, int]): The prompt/completion/cached token counts of the response.
+            retries (int): The number of retried attempts.
+            ok (bool): Whether the request eventually succeeded.
+        """
+        with self.lock:
+            stats = self._language(language)
+            stats["requests"] += 1
+            stats["retries"] += retries
+            stats["request_seconds"] += seconds
+            if not ok:
+                stats["failed_requests"] += 1
+            for name in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+                stats[name] += (usage or {}).get(name, 0) or 0
+
+    def record_parse_failure(self, language):
+        with self.lock:
+            self._language(language)["parse_failures"] += 1
+
+    def record_language(self, language, seconds, texts, translated_texts):
+        """
+        Records the end-to-end latency and result of one language.
+
+        Args:
+            language (str): The target language.
+            seconds (float): The wall time spent translating the language.
+            texts (int): The number of texts sent.
+            translated_texts (int): The number of texts that came back translated.
+        """
+        with self.lock:
+            stats = self._language(language)
+            stats["latency_seconds"] += seconds
+            stats["texts"] += texts
+            stats["translated_texts"] += translated_texts
+
+    def record_resource_file_share(self, language, shares):
+        """
+        Records which fraction of a language's source text belongs to each resource file, to split its cost.
+
+        Args:
+            language (str): The target language.
+            shares (Mapping[str, float]): The fraction per resource file; the values add up to 1.
+        """
+        with self.lock:
+            self.resource_file_shares[language] = dict(shares)
+
+    def record_file_written(self, resource_file, code):
+        with self.lock:
+            self.files_written.setdefault(resource_file, []).append(code)
+
+    def finish_run(self):
+        with self.lock:
+            self.finished_at = time.time()
+
+    def summary(self):
+        """
+        Builds the JSON-serializable summary of the run.
+
+        Returns:
+            dict: The totals, per-language statistics and estimated costs.
+        """
+        with self.lock:
+            languages = {}
+            cost_by_resource_file = {}
+            for language, stats in self.languages.items():
+                cost = estimate_cost(self.model, stats["prompt_tokens"], stats["completion_tokens"], stats["cached_tokens"])
+                languages[language] = dict(stats, cost_usd=round(cost, 6))
+                for resource_file, share in self.resource_file_shares.get(language, {}).items():
+                    cost_by_resource_file[resource_file] = cost_by_resource_file.get(resource_file, 0.0) + cost * share
+
+            totals = {
+                name: sum(stats[name] for stats in self.languages.values())
+                for name in ("requests", "retries", "failed_requests", "parse_failures", "prompt_tokens", "completion_tokens", "cached_tokens")
+            }
+            totals["files_written"] = sum(len(codes) for codes in self.files_written.values())
+            totals["cost_usd"] = round(sum(stats["cost_usd"] for stats in languages.values()), 6)
+            finished_at = self.finished_at or time.time()
+
+            return {
+                "model": self.model,
+                "started_at": self.started_at,
+                "duration_seconds": round(finished_at - self.started_at, 3),
+                "totals": totals,
+                "languages": languages,
+                "files_written": {resource_file: sorted(codes) for resource_file, codes in self.files_written.items()},
+                "cost_by_resource_file_usd": {resource_file: round(cost, 6) for resource_file, cost in cost_by_resource_file.items()},
+            }
+
+    def prometheus_metrics(self, summary=None):
+        """
+        Renders the run in the Prometheus text exposition format, for node_exporter's textfile collector.
+
+        Returns:
+            str: The metrics.
+        """
+        summary = summary or self.summary()
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{escape_label(label)}"' for key, label in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if label_text else f"{METRIC_PREFIX}_{name} {value}")
+
+        languages = summary["languages"]
+        per_language = [
+            ("requests_total", "counter", "Translation requests sent, excluding retries.", "requests"),
+            ("retries_total", "counter", "Retried translation request attempts.", "retries"),
+            ("failed_requests_total", "counter", "Translation requests that failed after all retries.", "failed_requests"),
+            ("parse_failures_total", "counter", "Responses that could not be parsed into translations.", "parse_failures"),
+            ("prompt_tokens_total", "counter", "Prompt tokens reported by the API.", "prompt_tokens"),
+            ("completion_tokens_total", "counter", "Completion tokens reported by the API.", "completion_tokens"),
+            ("cached_tokens_total", "counter", "Prompt tokens served from the prompt cache.", "cached_tokens"),
+            ("language_latency_seconds", "gauge", "Wall time spent translating the language.", "latency_seconds"),
+            ("cost_usd", "gauge", "Estimated cost of the language in USD.", "cost_usd"),
+        ]
+        for name, metric_type, help_text, field in per_language:
+            metric(name, metric_type, help_text, [({"language": language}, stats[field]) for language, stats in sorted(languages.items())])
+
+        metric("files_written_total", "counter", "Localized RESX files written.", [
+            ({"resource_file": resource_file}, len(codes)) for resource_file, codes in sorted(summary["files_written"].items())
+        ])
+        metric("resource_file_cost_usd", "gauge", "Estimated cost attributed to the resource file in USD.", [
+            ({"resource_file": resource_file}, cost) for resource_file, cost in sorted(summary["cost_by_resource_file_usd"].items())
+        ])
+        metric("run_duration_seconds", "gauge", "Wall time of the translation run.", [({}, summary["duration_seconds"])])
+        metric("last_run_timestamp_seconds", "gauge", "Unix time the translation run started.", [({}, summary["started_at"])])
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, directory):
+        """
+        Writes `translation_run.json` and `translation_run.prom` into the directory.
+
+        Args:
+            directory (str): The output directory; it is created if needed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+        write_text_atomic(os.path.join(directory, "translation_run.json"), json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+        write_text_atomic(os.path.join(directory, "translation_run.prom"), self.prometheus_metrics(summary))
+        return summary
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def write_text_atomic(path, text):
+    # The textfile collector may read at any time, so never leave a partial file behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as temp_file:
+        temp_file.write(text)
+    os.replace(temp_path, path)
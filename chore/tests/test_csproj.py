@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csproj import UTF8_BOM, apply_csproj_sync, find_embedded_resources, plan_csproj_sync, sync_csproj
+
+
+def item(include, indent="    ", newline="\n"):
+    return (
+        f'{indent}<EmbeddedResource Include="{include}">{newline}'
+        f"{indent}  <DependentUpon>{include.partition('.')[0]}.cs</DependentUpon>{newline}"
+        f"{indent}</EmbeddedResource>{newline}"
+    )
+
+
+def project_text(includes, indent="    ", newline="\n"):
+    items = "".join(item(include, indent, newline) for include in includes)
+    return f"<Project>{newline}  <ItemGroup>{newline}{items}  </ItemGroup>{newline}</Project>{newline}"
+
+
+def test_items_with_other_attributes_are_recognized(tmp_path):
+    project = (
+        '<Project>\n'
+        '  <ItemGroup>\n'
+        '    <EmbeddedResource Include="Forge.de.resx" Condition="\'$(Configuration)\' == \'Release\'">\n'
+        '      <DependentUpon>Forge.cs</DependentUpon>\n'
+        '    </EmbeddedResource>\n'
+        '    <EmbeddedResource LogicalName="Forge.ja.resources" Include="Forge.ja.resx" />\n'
+        '  </ItemGroup>\n'
+        '</Project>\n'
+    )
+    assert [include for include, _, _ in find_embedded_resources(project)] == ["Forge.de.resx", "Forge.ja.resx"]
+
+    csproj_path = tmp_path / "TextCraft.csproj"
+    csproj_path.write_text(project, encoding="utf-8")
+    for name in ("Forge.resx", "Forge.de.resx", "Forge.ja.resx"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    assert sync_csproj(str(csproj_path), str(tmp_path), ["Forge"], ["de", "ja"]) == ([], [])
+    assert csproj_path.read_text(encoding="utf-8") == project
+
+
+def test_plan_only_manages_localized_items_of_the_resource_files():
+    included = ["Forge.resx", "Forge.de.resx", "Forge.fr.resx", "Forge.ja.resx", "Other.de.resx", "Strings.resx"]
+    resx_file_names = {"Forge.resx", "Forge.de.resx", "Forge.es.resx", "Forge.ja.resx", "Forge.ko.resx", "Strings.resx"}
+    to_add, to_remove = plan_csproj_sync(included, resx_file_names, ["Forge"], ["de", "es", "ja", "ko"], excluded_language_codes=["ja"])
+    # The neutral files and the items of other resource files stay, even when their file is missing
+    assert to_add == ["Forge.es.resx", "Forge.ko.resx"]
+    assert to_remove == ["Forge.fr.resx", "Forge.ja.resx"]
+
+
+def test_apply_inserts_items_alphabetically_and_keeps_the_formatting():
+    text = project_text(["Forge.resx", "Forge.de.resx", "Forge.ja.resx", "Forge.zh.resx"], indent="\t\t", newline="\r\n")
+    updated = apply_csproj_sync(text, ["Forge.es.resx", "Forge.ko.resx"], ["Forge.zh.resx"])
+    assert updated == project_text(
+        ["Forge.resx", "Forge.de.resx", "Forge.es.resx", "Forge.ja.resx", "Forge.ko.resx"], indent="\t\t", newline="\r\n",
+    )
+
+
+def test_apply_adds_an_item_group_to_a_project_without_resources():
+    assert apply_csproj_sync("<Project>\n</Project>\n", ["Forge.de.resx"], []) == (
+        "<Project>\n  <ItemGroup>\n" + item("Forge.de.resx") + "  </ItemGroup>\n</Project>\n"
+    )
+
+
+def test_sync_keeps_the_byte_order_mark_and_leaves_an_unchanged_project_alone(tmp_path):
+    csproj_path = tmp_path / "TextCraft.csproj"
+    csproj_path.write_bytes(UTF8_BOM + project_text(["Forge.resx", "Forge.ja.resx"]).encode("utf-8"))
+    for name in ("Forge.resx", "Forge.de.resx", "Forge.ja.resx"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+
+    assert sync_csproj(str(csproj_path), str(tmp_path), ["Forge"], ["de", "ja"], dry_run=True) == (["Forge.de.resx"], [])
+    assert csproj_path.read_bytes() == UTF8_BOM + project_text(["Forge.resx", "Forge.ja.resx"]).encode("utf-8")
+    assert sync_csproj(str(csproj_path), str(tmp_path), ["Forge"], ["de", "ja"]) == (["Forge.de.resx"], [])
+    assert csproj_path.read_bytes() == UTF8_BOM + project_text(["Forge.resx", "Forge.de.resx", "Forge.ja.resx"]).encode("utf-8")
+
+    modified = csproj_path.stat().st_mtime_ns
+    os.utime(csproj_path, ns=(modified - 10**9, modified - 10**9))
+    assert sync_csproj(str(csproj_path), str(tmp_path), ["Forge"], ["de", "ja"]) == ([], [])
+    assert csproj_path.stat().st_mtime_ns == modified - 10**9
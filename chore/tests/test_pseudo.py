@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pseudo import POP_DIRECTIONAL_FORMATTING, RIGHT_TO_LEFT_OVERRIDE, pseudo_localize
+from verify import check_translation
+
+
+def test_placeholders_are_not_accented():
+    assert pseudo_localize("Save {0}?", padding=0) == "[Šåṽé {0}?]"
+    assert pseudo_localize("{0:N2} of {1,-10:d} bytes", padding=0) == "[{0:N2} öƒ {1,-10:d} ƀýţéš]"
+
+
+def test_padding_lengthens_the_text_without_counting_newlines():
+    text = "Open the\nfile"
+    pseudo_text = pseudo_localize(text, padding=0.5)
+    # Brackets, the 12 characters of the text and its newline, and 6 characters of filler
+    assert len(pseudo_text) == 2 + 13 + 6
+    assert pseudo_text.startswith("[Öþéñ ţĥé\nƒîļé ļöŕé")
+
+
+def test_mirrored_text_wraps_every_line_in_directional_formatting():
+    assert pseudo_localize("Line one\nLine two", padding=0, mirror=True) == (
+        f"{RIGHT_TO_LEFT_OVERRIDE}[Ļîñé öñé{POP_DIRECTIONAL_FORMATTING}\n"
+        f"{RIGHT_TO_LEFT_OVERRIDE}Ļîñé ţŵö]{POP_DIRECTIONAL_FORMATTING}"
+    )
+
+
+def test_pseudo_translations_pass_verification():
+    for text in ("Save {0}?", "{1} of {0}\n{0} left", "Copied {0:N0} files to {1}."):
+        for mirror in (False, True):
+            assert check_translation(text, pseudo_localize(text, mirror=mirror)) == []
@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import RateLimiter, backoff_delay, parse_reset_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1s", 1.0),
+    ("6m0s", 360.0),
+    ("20ms", 0.02),
+    ("1h2m3.5s", 3723.5),
+    ("2.5", 2.5),
+])
+def test_parse_reset_duration(value, expected):
+    assert parse_reset_duration(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", ["", None, "soon"])
+def test_parse_reset_duration_rejects_unparseable_values(value):
+    assert parse_reset_duration(value) is None
+
+
+def test_backoff_delay_grows_exponentially_up_to_the_cap():
+    random.seed(0)
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=8.0) <= min(8.0, 2 ** attempt)
+
+
+def test_backoff_delay_prefers_the_server_delay():
+    random.seed(0)
+    assert 30.0 <= backoff_delay(0, base=1.0, retry_after=30.0) <= 31.0
+    assert 60.0 <= backoff_delay(0, base=1.0, cap=60.0, retry_after=300.0) <= 61.0
+
+
+def test_acquire_waits_for_the_request_budget_to_refill():
+    clock = FakeClock()
+    limiter = RateLimiter(2, 1_000_000, clock=clock, sleep=clock.sleep)
+    limiter.acquire(10)
+    limiter.acquire(10)
+    assert clock.sleeps == []
+
+    # Two requests per minute refill one request every 30 seconds
+    limiter.acquire(10)
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+
+
+def test_acquire_waits_for_the_token_budget_and_caps_oversized_requests():
+    clock = FakeClock()
+    limiter = RateLimiter(1000, 600, clock=clock, sleep=clock.sleep)
+    limiter.acquire(500)
+    limiter.acquire(200)
+    assert sum(clock.sleeps) == pytest.approx(10.0)
+
+    # A request larger than the whole budget waits for a full budget instead of forever
+    limiter.acquire(10_000)
+    assert sum(clock.sleeps) == pytest.approx(70.0)
+
+
+def test_exhausted_server_budget_pauses_every_worker_until_the_reset():
+    clock = FakeClock()
+    limiter = RateLimiter(1000, 1_000_000, clock=clock, sleep=clock.sleep)
+    limiter.update_from_headers({
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "12s",
+        "x-ratelimit-remaining-tokens": "5000",
+    })
+    limiter.acquire(10)
+    assert clock.now >= 12.0
+
+
+def test_headers_lower_the_local_budget():
+    clock = FakeClock()
+    limiter = RateLimiter(1000, 1_000_000, clock=clock, sleep=clock.sleep)
+    limiter.update_from_headers({"x-ratelimit-remaining-tokens": "100", "x-ratelimit-reset-tokens": "1s"})
+    limiter.acquire(50)
+    assert clock.sleeps == []
+    limiter.acquire(100)
+    assert clock.sleeps != []
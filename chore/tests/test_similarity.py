@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import similarity
+from similarity import SimilarityIndex, jaccard_similarity, shingles
+
+TEXTS = [
+    "Open the selected file",
+    "Open the selected files",
+    "Close the selected file",
+    "Rewrite the paragraph in a formal tone",
+    "Short",
+]
+
+
+def test_query_ranks_similar_texts_without_the_text_itself():
+    index = SimilarityIndex(TEXTS)
+    matches = index.query("Open the selected file")
+    assert [text for text, _ in matches] == ["Open the selected files", "Close the selected file"]
+    assert matches[0][1] == jaccard_similarity(shingles("Open the selected file"), shingles("Open the selected files"))
+    assert index.query("Open the selected file", limit=1) == matches[:1]
+
+
+def test_query_drops_matches_below_the_minimum_similarity():
+    index = SimilarityIndex(TEXTS)
+    similarities = [similarity for _, similarity in index.query("Open the selected file")]
+    assert [text for text, _ in index.query("Open the selected file", min_similarity=similarities[0])] == [
+        "Open the selected files",
+    ]
+    assert index.query("Open the selected file", min_similarity=1.0) == []
+
+
+def test_short_texts_are_neither_indexed_nor_looked_up():
+    index = SimilarityIndex(TEXTS + ["Open the selected file"])
+    assert len(index) == 4
+    assert "Short" not in index.positions
+    assert index.query("Open the sel") != []
+    assert index.query("Open the se") == []
+
+
+def test_saved_index_answers_queries_like_the_original(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = SimilarityIndex(TEXTS)
+    index.save(path, {"last_rowid": 42})
+    loaded, state = SimilarityIndex.load(path)
+    assert state == {"last_rowid": 42}
+    assert loaded.texts == index.texts
+    assert loaded.buckets == index.buckets
+    for text in TEXTS + ["Open the chosen file", "Rewrite the paragraph in a casual tone"]:
+        assert loaded.query(text) == index.query(text)
+
+    # A loaded index can be extended with new texts
+    loaded.add("Open the chosen file")
+    assert loaded.query("Open the chosen file")[0][0] == "Open the selected file"
+
+
+def test_load_ignores_missing_files_and_other_versions(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.json")
+    assert SimilarityIndex.load(path) is None
+    SimilarityIndex(TEXTS).save(path, {})
+    with open(path, encoding="utf-8") as index_file:
+        assert json.load(index_file)["version"] == similarity.INDEX_VERSION
+    monkeypatch.setattr(similarity, "INDEX_VERSION", similarity.INDEX_VERSION + 1)
+    assert SimilarityIndex.load(path) is None
@@ -0,0 +1,53 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizers import heuristic_token_count, load_tokenizer, tiktoken_cache_path
+
+
+def fake_tiktoken(loaded):
+    def get_encoding(encoding_name):
+        loaded.append(encoding_name)
+        return types.SimpleNamespace(name=encoding_name, encode=lambda text: text.split())
+
+    def encoding_name_for_model(model):
+        if model != "gpt-4o-mini":
+            raise KeyError(model)
+        return "o200k_base"
+
+    return types.SimpleNamespace(get_encoding=get_encoding, encoding_name_for_model=encoding_name_for_model)
+
+
+def test_tiktoken_is_not_loaded_without_a_cached_encoding(tmp_path, monkeypatch):
+    loaded = []
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken(loaded))
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+
+    assert load_tokenizer("tiktoken", "gpt-4o-mini") == (heuristic_token_count, "heuristic")
+    assert loaded == []
+
+
+def test_tiktoken_is_used_with_a_cached_encoding(tmp_path, monkeypatch):
+    loaded = []
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken(loaded))
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    open(tiktoken_cache_path("o200k_base"), "w").close()
+
+    count_tokens, tokenizer_name = load_tokenizer("tiktoken", "unknown-model")
+    assert tokenizer_name == "tiktoken (o200k_base)"
+    assert count_tokens("three short words") == 3
+    assert loaded == ["o200k_base"]
+
+
+def test_tokenizers_that_fail_to_load_fall_back_to_the_heuristic(tmp_path, monkeypatch):
+    def get_encoding(encoding_name):
+        raise OSError("the download failed")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding, encoding_name_for_model=lambda model: "o200k_base"))
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    open(tiktoken_cache_path("o200k_base"), "w").close()
+
+    assert load_tokenizer("tiktoken", "gpt-4o-mini") == (heuristic_token_count, "heuristic")
+    assert load_tokenizer("missing_module:count") == (heuristic_token_count, "heuristic")
@@ -0,0 +1,255 @@
+import os
+import stat
+import sys
+import threading
+import xml.etree.ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import translate
+from translation_memory import TranslationMemory
+
+CSPROJ = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <EmbeddedResource Include="Sample.resx">
+      <DependentUpon>Sample.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Sample.ja.resx">
+      <DependentUpon>Sample.cs</DependentUpon>
+    </EmbeddedResource>
+  </ItemGroup>
+</Project>
+"""
+
+
+def write_resx(path, values):
+    root = ET.Element("root")
+    for key, value in values.items():
+        data = ET.SubElement(root, "data", {"name": key, "xml:space": "preserve"})
+        ET.SubElement(data, "value").text = value
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def read_values(path):
+    return {data.attrib["name"]: data.find("value").text for data in ET.parse(path).getroot().findall("data")}
+
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """
+    A fresh clone of a project with one resource file, translated into Japanese by hand and not yet into German.
+    There is no manifest, translation memory or any other state file, as they are all git-ignored.
+    """
+    write_resx(tmp_path / "Sample.resx", {"okButton.Text": "Hello world", "cancelButton.Text": "Open the file"})
+    write_resx(tmp_path / "Sample.ja.resx", {"okButton.Text": "こんにちは世界", "cancelButton.Text": "ファイルを開く"})
+    (tmp_path / "TextCraft.csproj").write_text(CSPROJ, encoding="utf-8")
+    (tmp_path / "chore").mkdir()
+    # translate.py resolves the repository root as "../" and keeps its state files in the working directory
+    monkeypatch.chdir(tmp_path / "chore")
+
+    monkeypatch.setattr(translate, "resource_files", {"Sample": ["okButton.Text", "cancelButton.Text", "helpButton.Text"]})
+    monkeypatch.setattr(translate, "language_mapping", {"German": "de", "Japanese": "ja"})
+    monkeypatch.setattr(translate, "KEY_DISCOVERY", False)
+    monkeypatch.setattr(translate, "TRANSLATION_BACKEND", "stub")
+    monkeypatch.setattr(translate, "backend", None)
+    return tmp_path
+
+
+def test_translate_only_requests_the_delta_and_syncs_the_project(project):
+    japanese_before = (project / "Sample.ja.resx").read_bytes()
+    umask = os.umask(0)
+    os.umask(umask)
+
+    # Without a manifest, the existing Japanese translations must be kept rather than requested again
+    translate.main(["translate"])
+    assert os.path.exists(translate.MANIFEST_PATH)
+    assert (project / "Sample.ja.resx").read_bytes() == japanese_before
+    assert read_values(project / "Sample.de.resx") == {
+        "okButton.Text": "[German] Hello world",
+        "cancelButton.Text": "[German] Open the file",
+    }
+    assert file_mode(project / "Sample.de.resx") == 0o666 & ~umask
+    assert 'Include="Sample.de.resx"' in (project / "TextCraft.csproj").read_text(encoding="utf-8")
+
+    # Only the changed and the added key are translated; the rewritten file keeps its mode
+    write_resx(project / "Sample.resx", {
+        "okButton.Text": "Hello world",
+        "cancelButton.Text": "Open a file",
+        "helpButton.Text": "Show the help",
+    })
+    os.chmod(project / "Sample.ja.resx", 0o640)
+    translate.main(["translate"])
+    assert read_values(project / "Sample.ja.resx") == {
+        "okButton.Text": "こんにちは世界",
+        "cancelButton.Text": "[Japanese] Open a file",
+        "helpButton.Text": "[Japanese] Show the help",
+    }
+    assert file_mode(project / "Sample.ja.resx") == 0o640
+
+    # Deleting a language removes its file from the project again
+    translate.main(["prune", "--whole-files", "--languages", "German"])
+    assert not os.path.exists(project / "Sample.de.resx")
+    assert (project / "TextCraft.csproj").read_text(encoding="utf-8") == CSPROJ
+
+
+def test_translate_batch_stops_before_the_next_request_once_interrupted(monkeypatch):
+    monkeypatch.setattr(translate, "TRANSLATION_BACKEND", "stub")
+    monkeypatch.setattr(translate, "backend", None)
+    stop = threading.Event()
+    stored = []
+
+    def on_chunk(texts, translations):
+        stored.append(dict(zip(texts, translations)))
+        stop.set()
+
+    # Multi-line texts are always sent on their own, so this is three requests
+    texts = ["First\nline", "Second\nline", "Third\nline"]
+    translations = translate.translate_batch(texts, "German", stop_event=stop, on_chunk=on_chunk)
+    assert translations == ["[German] First\nline", None, None]
+    assert stored == [{"First\nline": "[German] First\nline"}]
+
+
+def test_seed_cache_skips_translations_of_changed_texts(project):
+    translate.main(["translate"])
+    write_resx(project / "Sample.resx", {"okButton.Text": "Hello world", "cancelButton.Text": "Open a file"})
+
+    translate.main(["seed-cache"])
+    translation_memory = TranslationMemory(translate.TRANSLATION_MEMORY_PATH)
+    cached = translation_memory.get_many(["Hello world", "Open a file"], "ja", translate.MODEL_NAME, translate.PROMPT_HASH)
+    translation_memory.close()
+    assert cached == {"Hello world": "こんにちは世界"}
+
+    # The changed text is still pending and gets translated again
+    translate.main(["translate"])
+    assert read_values(project / "Sample.ja.resx") == {
+        "okButton.Text": "こんにちは世界",
+        "cancelButton.Text": "[Japanese] Open a file",
+    }
+
+
+def test_derived_translations_are_not_reused_when_translating_from_scratch(project, monkeypatch):
+    monkeypatch.setattr(translate, "language_mapping", {"Serbian (Cyrillic)": "sr-Cyrl", "Serbian (Latin)": "sr-Latn"})
+    translate.main(["translate"])
+    assert read_values(project / "Sample.sr-Latn.resx")["okButton.Text"] == "[Serbian (Cyrillic)] Hello world"
+
+    os.remove(project / "Sample.sr-Latn.resx")
+    monkeypatch.setattr(translate, "LOCALE_DERIVATION", False)
+    translate.main(["translate"])
+    assert read_values(project / "Sample.sr-Latn.resx")["okButton.Text"] == "[Serbian (Latin)] Hello world"
+
+
+def state_files():
+    return {
+        os.path.join(directory, name): os.stat(os.path.join(directory, name)).st_mtime_ns
+        for directory, _, names in os.walk(".")
+        for name in names
+    }
+
+
+def test_status_and_plan_leave_the_state_files_alone(project, monkeypatch):
+    monkeypatch.setattr(translate, "KEY_DISCOVERY", True)
+    translate.main(["status"])
+    translate.main(["plan"])
+    assert state_files() == {}
+
+    translate.main(["translate"])
+    write_resx(project / "Sample.resx", {"okButton.Text": "Hello world", "cancelButton.Text": "Open the file in a new window"})
+    before = state_files()
+    translate.main(["status"])
+    translate.main(["plan"])
+    assert state_files() == before
+
+
+def test_chunk_texts_fills_the_token_budget_and_isolates_long_entries():
+    texts = ["a" * 40, "b" * 40, "c" * 40, "multi\nline", "d" * 40, "e" * 600]
+    # Every short text is estimated at 11 tokens, so two fit in a budget of 25; the multi-line and the long text
+    # are sent on their own without breaking up the chunk being filled
+    assert translate.chunk_texts(texts, token_budget=25) == [[0, 1], [3], [5], [2, 4]]
+    assert translate.chunk_texts(texts, token_budget=1000) == [[3], [5], [0, 1, 2, 4]]
+
+
+def test_chunk_texts_counts_the_reference_translations():
+    texts = ["a" * 40, "b" * 40]
+    references = {"a" * 40: ("x" * 40, "y" * 40, 0.8)}
+    assert translate.chunk_texts(texts, token_budget=40) == [[0, 1]]
+    assert translate.chunk_texts(texts, token_budget=40, references=references) == [[0], [1]]
+
+
+def test_translate_with_bisection_only_requests_the_failing_half_again(monkeypatch):
+    requested = []
+
+    def translate_chunk(texts, target_language, references=None, stop_event=None):
+        requested.append(list(texts))
+        if "bad" in texts and len(texts) > 1:
+            raise ValueError("Mismatched translation count.")
+        return [f"[{target_language}] {text}" for text in texts]
+
+    monkeypatch.setattr(translate, "translate_chunk", translate_chunk)
+    texts = ["one", "two", "three", "bad"]
+    assert translate.translate_with_bisection(texts, "German") == [f"[German] {text}" for text in texts]
+    assert requested == [["one", "two", "three", "bad"], ["one", "two"], ["three", "bad"], ["three"], ["bad"]]
+
+
+def test_translate_batch_leaves_untranslatable_chunks_empty(monkeypatch):
+    def translate_chunk(texts, target_language, references=None, stop_event=None):
+        if texts == ["bad\ntext"]:
+            raise ValueError("Mismatched translation count.")
+        return [text.upper() for text in texts]
+
+    monkeypatch.setattr(translate, "translate_chunk", translate_chunk)
+    assert translate.translate_batch(["good\ntext", "bad\ntext"], "German") == ["GOOD\nTEXT", None]
+
+
+def test_parse_numbered_translations_keeps_multiline_texts():
+    content = "1. Hallo\n   zweite Zeile\n2. Danke"
+    assert translate.parse_numbered_translations(content, ["Hello\nsecond line", "Thanks"]) == ["Hallo\nzweite Zeile", "Danke"]
+
+
+def test_parse_numbered_translations_rejects_a_count_mismatch():
+    with pytest.raises(ValueError, match="Expected 3, got 2"):
+        translate.parse_numbered_translations("1. Eins\n2. Zwei", ["One", "Two", "Three"])
+
+
+def test_parse_numbered_translations_takes_a_single_text_as_is():
+    # The lines of a single text may look like numbering themselves
+    content = "1. Schritte:\n1. Öffnen\n2. Speichern"
+    assert translate.parse_numbered_translations(content, ["Steps:\n1. Open\n2. Save"]) == ["Schritte:\n1. Öffnen\n2. Speichern"]
+
+
+def test_parse_json_translations_orders_the_values_by_id():
+    content = '{"2": "Danke", "1": "Hallo\\nWelt"}'
+    assert translate.parse_json_translations(content, ["Hello\nworld", "Thanks"]) == ["Hallo\nWelt", "Danke"]
+
+
+@pytest.mark.parametrize("content, message", [
+    ('{"1": "Hallo"', "Invalid JSON"),
+    ('["Hallo", "Danke"]', "Mismatched translation IDs"),
+    ('{"1": "Hallo"}', "Mismatched translation IDs"),
+    ('{"1": "Hallo", "3": "Danke"}', "Mismatched translation IDs"),
+    ('{"1": "Hallo", "2": null}', "non-string values"),
+])
+def test_parse_json_translations_rejects_malformed_responses(content, message):
+    with pytest.raises(ValueError, match=message):
+        translate.parse_json_translations(content, ["Hello", "Thanks"])
+
+
+def test_parse_adaptation_response_keeps_the_base_translation_for_nulls():
+    content = '{"1": null, "2": "Hvala lepo"}'
+    assert translate.parse_adaptation_response(content, ["Zdravo", "Hvala"]) == ["Zdravo", "Hvala lepo"]
+
+
+@pytest.mark.parametrize("content, message", [
+    ("null,", "Invalid JSON"),
+    ('{"1": null}', "Mismatched adaptation IDs"),
+    ('{"1": null, "2": 2}', "neither strings nor null"),
+])
+def test_parse_adaptation_response_rejects_malformed_responses(content, message):
+    with pytest.raises(ValueError, match=message):
+        translate.parse_adaptation_response(content, ["Zdravo", "Hvala"])
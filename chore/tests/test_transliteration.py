@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transliteration import serbian_cyrillic_to_latin
+
+
+@pytest.mark.parametrize("cyrillic, latin", [
+    ("Љубав", "Ljubav"),
+    ("ЊЕГОШ", "NJEGOŠ"),
+    ("Љубав ЊЕГОШ", "Ljubav NJEGOŠ"),
+    ("ЏЕП", "DŽEP"),
+    ("ТАЏ", "TADŽ"),
+    ("ТАЏ!", "TADŽ!"),
+    ("Џеп", "Džep"),
+    ("Џ", "Dž"),
+    ("ђак, ћерка, џеп, љиљан, њива", "đak, ćerka, džep, ljiljan, njiva"),
+])
+def test_digraphs_follow_the_case_of_their_word(cyrillic, latin):
+    assert serbian_cyrillic_to_latin(cyrillic) == latin
+
+
+def test_placeholders_and_access_keys_are_left_alone():
+    assert serbian_cyrillic_to_latin("&Отвори {0} (Ctrl+O)\n{1:N0} датотека") == "&Otvori {0} (Ctrl+O)\n{1:N0} datoteka"
@@ -0,0 +1,52 @@
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translation_memory import hash_text
+from verify import check_localized_file, check_translation, find_placeholders
+
+
+def test_find_placeholders_handles_repeats_and_format_specifiers():
+    assert find_placeholders("{1} of {0:N0}, {0,-8} left") == [0, 0, 1]
+    assert find_placeholders("{{literal}} {name} and {}") == []
+
+
+@pytest.mark.parametrize("source, translation, issues", [
+    ("Save {0}?", "Speichern {0}?", []),
+    ("First\nSecond", "Erste\nZweite", []),
+    ("Save", None, ["empty"]),
+    ("Save", "  \n", ["empty"]),
+    ("{0} of {1}", "{1} von {0}", []),
+    ("{0} of {1}", "{0} von {0}", ["placeholders"]),
+    ("Copy {0:N0} files", "{0} Dateien kopieren", []),
+    ("First\nSecond", "Erste Zweite", ["newlines"]),
+    ("First\nSecond {0}", "Erste Zweite", ["placeholders", "newlines"]),
+    ("One line", "Eine\nZeile", []),
+])
+def test_check_translation(source, translation, issues):
+    assert [issue for issue, _ in check_translation(source, translation)] == issues
+
+
+def test_check_localized_file_reports_stale_missing_and_extra_keys(tmp_path):
+    root = ET.Element("root")
+    for key, value in {"okButton.Text": "OK", "cancelButton.Text": "Abbrechen {0}", "oldButton.Text": "Alt"}.items():
+        ET.SubElement(ET.SubElement(root, "data", {"name": key}), "value").text = value
+    ET.ElementTree(root).write(tmp_path / "Sample.de.resx", encoding="utf-8", xml_declaration=True)
+
+    source_values = {"okButton.Text": "OK", "cancelButton.Text": "Cancel", "helpButton.Text": "Help"}
+    manifest_hashes = {"okButton.Text": hash_text("Okay"), "cancelButton.Text": hash_text("Cancel")}
+    issues = check_localized_file((str(tmp_path), "Sample", "de", source_values, manifest_hashes, set(source_values), "the listed keys"))
+    assert [(issue["key"], issue["issue"]) for issue in issues] == [
+        ("okButton.Text", "stale"),
+        ("cancelButton.Text", "placeholders"),
+        ("helpButton.Text", "missing_key"),
+        ("oldButton.Text", "extra_key"),
+    ]
+
+    issues = check_localized_file((str(tmp_path), "Sample", "fr", source_values, {}, set(source_values), "the listed keys"))
+    assert {issue["issue"] for issue in issues} == {"missing_key"}
+    assert len(issues) == len(source_values)
@@ -0,0 +1,68 @@
+import hashlib
+import importlib
+import os
+import tempfile
+
+# Where tiktoken downloads the BPE file of an encoding from; the local copy is named after the SHA-1 of this URL
+TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+
+def heuristic_token_count(text):
+    # About four characters per token for English text, the estimate translate.py also uses for its budgets
+    return len(text) // 4 + 1
+
+
+def tiktoken_cache_path(encoding_name):
+    """
+    Returns:
+        str | None: The file tiktoken caches the BPE ranks of an encoding in, or None when its cache is disabled.
+    """
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, hashlib.sha1(TIKTOKEN_BLOB_URL.format(encoding_name).encode()).hexdigest())
+
+
+def load_tokenizer(name, model=None):
+    """
+    Returns a function that counts the tokens of a text.
+
+    Args:
+        name (str): "heuristic"; "tiktoken", which needs the optional tiktoken package and is only used when
+            the encoding file is already in its local cache (TIKTOKEN_CACHE_DIR), since loading it would
+            otherwise download it; or "module:function" for any callable that takes a text and returns its
+            token count.
+        model (str | None): The model whose tiktoken encoding to use.
+
+    Returns:
+        tuple[Callable[[str], int], str]: The counting function and the name of the tokenizer actually used,
+            which is "heuristic" when the requested one isn't available.
+    """
+    if name == "heuristic":
+        return heuristic_token_count, "heuristic"
+
+    try:
+        if name == "tiktoken":
+            import tiktoken
+
+            try:
+                encoding_name = tiktoken.encoding_name_for_model(model) if model else "o200k_base"
+            except KeyError:
+                encoding_name = "o200k_base"
+            cache_path = tiktoken_cache_path(encoding_name)
+            if cache_path is None or not os.path.exists(cache_path):
+                raise LookupError(f"the {encoding_name} encoding is not in the local tiktoken cache")
+            encoding = tiktoken.get_encoding(encoding_name)
+            return lambda text: len(encoding.encode(text)), f"tiktoken ({encoding.name})"
+
+        module_name, _, function_name = name.partition(":")
+        return getattr(importlib.import_module(module_name), function_name), name
+    # Anything else a tokenizer raises while loading, such as a failed download, falls back as well
+    except Exception as e:
+        print(f"Tokenizer '{name}' is not available ({e}); falling back to the heuristic estimate.")
+        return heuristic_token_count, "heuristic"
@@ -1,15 +1,110 @@
+import argparse
+import contextlib
 import os
+import queue
+import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
 import json
 
+from backends import BackendError, create_backend
+from csproj import sync_csproj
+from delete import delete_all_localized_resx_files, find_localized_resx_files, prune_localized_resx_files
+from discovery import build_key_index, compare_with_listed_keys, discover_keys
+from journal import RunJournal
+from pseudo import MIRRORED_PSEUDO_LOCALE, PSEUDO_LOCALE, pseudo_localize
+from similarity import SimilarityIndex
+from resx import load_resx_root, read_resx_values, remove_resx_values, set_resx_values, write_resx_atomic
+from rate_limit import RateLimiter, backoff_delay, parse_reset_duration
+from telemetry import RunTelemetry, estimate_cost
+from tokenizers import load_tokenizer
+from transliteration import TRANSLITERATIONS
+from translation_memory import TranslationMemory, hash_text
+from verify import RETRANSLATABLE_ISSUES, find_placeholders, summarize_issues, verify_localized_files
+from watch import FileWatcher
+
 # Load the API key from environment variable
 API_KEY = os.getenv("TEXTCRAFT_API_KEY")
 
-if not API_KEY:
-    raise EnvironmentError("Please set the TEXTCRAFT_API_KEY in your environment variables.")
+# "openai" for any OpenAI-compatible endpoint, "ollama" for the native Ollama API, or "stub" for offline test runs
+TRANSLATION_BACKEND = os.getenv("TEXTCRAFT_TRANSLATE_BACKEND", "openai")
+BACKEND_ENDPOINT = os.getenv("TEXTCRAFT_OLLAMA_ENDPOINT") if TRANSLATION_BACKEND == "ollama" else os.getenv("TEXTCRAFT_OPENAI_ENDPOINT")
+
+# Concurrency and rate-limit budgets for the translation requests
+MAX_CONCURRENT_LANGUAGES = int(os.getenv("TEXTCRAFT_TRANSLATE_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(os.getenv("TEXTCRAFT_TRANSLATE_RPM", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("TEXTCRAFT_TRANSLATE_TPM", "200000"))
+MAX_RETRIES = int(os.getenv("TEXTCRAFT_TRANSLATE_MAX_RETRIES", "6"))
+
+# Estimated source tokens per request; multi-line entries and entries above LONG_ENTRY_TOKENS get a request of their own
+CHUNK_TOKEN_BUDGET = int(os.getenv("TEXTCRAFT_TRANSLATE_CHUNK_TOKENS", "1500"))
+LONG_ENTRY_TOKENS = 100
+
+MODEL_NAME = os.getenv("TEXTCRAFT_TRANSLATE_MODEL", "gpt-4o-mini-2024-07-18")
+
+# "json" sends {id: text} objects and validates the JSON reply against a schema; "numbered" uses the numbered-line format
+TRANSLATION_PROTOCOL = os.getenv("TEXTCRAFT_TRANSLATE_PROTOCOL", "json")
+
+# Translations produced by earlier runs are reused from this SQLite cache
+TRANSLATION_MEMORY_PATH = os.getenv("TEXTCRAFT_TRANSLATION_MEMORY", "translation_memory.sqlite3")
+
+# Texts missing from the translation memory are matched against the similar texts it holds (Jaccard similarity of
+# character trigrams). Above the reference threshold the earlier translation is sent along with the request; above the
+# reuse threshold it is used as is. Reuse is off by default because near-duplicates can differ in a word that matters.
+FUZZY_MATCHING = os.getenv("TEXTCRAFT_FUZZY_MATCHING", "1") != "0"
+FUZZY_REFERENCE_THRESHOLD = float(os.getenv("TEXTCRAFT_FUZZY_REFERENCE_THRESHOLD", "0.5"))
+FUZZY_REUSE_THRESHOLD = float(os.getenv("TEXTCRAFT_FUZZY_REUSE_THRESHOLD", "inf"))
+# The index of the translation memory's source texts is kept here between runs and only extended with new entries
+SIMILARITY_INDEX_PATH = os.getenv("TEXTCRAFT_SIMILARITY_INDEX", f"{os.path.splitext(TRANSLATION_MEMORY_PATH)[0]}.similarity.json")
+
+# Derive closely related locales from their parent's translation (see locale_derivations); "0" translates every locale from scratch
+LOCALE_DERIVATION = os.getenv("TEXTCRAFT_LOCALE_DERIVATION", "1") != "0"
+
+# Source-text hashes of the keys written by earlier runs, used to translate only what changed
+MANIFEST_PATH = os.getenv("TEXTCRAFT_TRANSLATION_MANIFEST", "translation_manifest.json")
+
+# Localized files finished by the current run, kept until it completes so an interrupted run can be resumed
+JOURNAL_PATH = os.getenv("TEXTCRAFT_TRANSLATION_JOURNAL", "translation_journal.jsonl")
+
+# Token counting for `plan`: "heuristic", "tiktoken" or "module:function" (see tokenizers.load_tokenizer)
+TOKENIZER = os.getenv("TEXTCRAFT_TOKENIZER", "heuristic")
+# Latency model for `plan`: a fixed overhead per request plus the time to generate the reply
+PLAN_REQUEST_SECONDS = float(os.getenv("TEXTCRAFT_PLAN_REQUEST_SECONDS", "1.0"))
+PLAN_OUTPUT_TOKENS_PER_SECOND = float(os.getenv("TEXTCRAFT_PLAN_OUTPUT_TOKENS_PER_SECOND", "60"))
+# Chat formatting tokens the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Per-run JSON summary and Prometheus textfile metrics are written here
+TELEMETRY_DIR = os.getenv("TEXTCRAFT_TELEMETRY_DIR", "telemetry")
+
+# Translate only the keys of resource_files that the C# code references; "0" uses the hand-maintained lists as they are
+KEY_DISCOVERY = os.getenv("TEXTCRAFT_KEY_DISCOVERY", "1") != "0"
+# Scan results of the C# sources and neutral RESX files, reused while their mtimes don't change
+KEY_INDEX_PATH = os.getenv("TEXTCRAFT_KEY_INDEX", "key_index.json")
+
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+telemetry = RunTelemetry(MODEL_NAME)
+
+# The backend is only created once a request is actually sent, so offline modes don't need an API key
+backend = None
 
-client = OpenAI(api_key=API_KEY)
+# (SimilarityIndex, state) kept for the rest of the process once loaded, see get_similarity_index
+similarity_index = None
+
+
+def get_backend():
+    global backend
+    if backend is None:
+        backend = create_backend(
+            TRANSLATION_BACKEND,
+            MODEL_NAME,
+            api_key=API_KEY,
+            base_url=BACKEND_ENDPOINT,
+            max_connections=MAX_CONCURRENT_LANGUAGES,
+        )
+    return backend
 
 # Define the list of strings requiring translation
 language_mapping = {
@@ -98,7 +193,22 @@ language_mapping = {
     "Welsh": "cy",
 }
 
-# Updated resource files and their corresponding entries
+# Closely related locales that are derived from the translation of a parent locale instead of being translated from
+# scratch, which keeps each language family consistent. "transliterate" converts the script locally without any request
+# (see transliteration.TRANSLITERATIONS); "adapt" sends the parent's translations and only asks for the entries the
+# regional variant words differently. Parents are never derived themselves.
+locale_derivations = {
+    "sr-Latn": ("sr-Cyrl", "transliterate"),
+    "sr-Cyrl-BA": ("sr-Cyrl", "adapt"),
+    "ca-ES-valencia": ("ca", "adapt"),
+    "pt-PT": ("pt-BR", "adapt"),
+    "es-MX": ("es-ES", "adapt"),
+    "fr-CA": ("fr-FR", "adapt"),
+    "nn": ("nb", "adapt"),
+}
+
+# Updated resource files and their corresponding entries. With KEY_DISCOVERY, each list is narrowed down
+# to the keys the C# code actually uses (see apply_key_discovery).
 resource_files = {
     "AboutBox": [
         "okButton.Text",
@@ -227,275 +337,1472 @@ resource_files = {
 }
 
 
-# Base XML template
-RESX_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
-<root>
-  <xsd:schema id="root" xmlns="" xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:msdata="urn:schemas-microsoft-com:xml-msdata">
-    <xsd:import namespace="http://www.w3.org/XML/1998/namespace" />
-    <xsd:element name="root" msdata:IsDataSet="true">
-      <xsd:complexType>
-        <xsd:choice maxOccurs="unbounded">
-          <xsd:element name="metadata">
-            <xsd:complexType>
-              <xsd:sequence>
-                <xsd:element name="value" type="xsd:string" minOccurs="0" />
-              </xsd:sequence>
-              <xsd:attribute name="name" use="required" type="xsd:string" />
-              <xsd:attribute name="type" type="xsd:string" />
-              <xsd:attribute name="mimetype" type="xsd:string" />
-              <xsd:attribute ref="xml:space" />
-            </xsd:complexType>
-          </xsd:element>
-          <xsd:element name="assembly">
-            <xsd:complexType>
-              <xsd:attribute name="alias" type="xsd:string" />
-              <xsd:attribute name="name" type="xsd:string" />
-            </xsd:complexType>
-          </xsd:element>
-          <xsd:element name="data">
-            <xsd:complexType>
-              <xsd:sequence>
-                <xsd:element name="value" type="xsd:string" minOccurs="0" msdata:Ordinal="1" />
-                <xsd:element name="comment" type="xsd:string" minOccurs="0" msdata:Ordinal="2" />
-              </xsd:sequence>
-              <xsd:attribute name="name" type="xsd:string" use="required" msdata:Ordinal="1" />
-              <xsd:attribute name="type" type="xsd:string" msdata:Ordinal="3" />
-              <xsd:attribute name="mimetype" type="xsd:string" msdata:Ordinal="4" />
-              <xsd:attribute ref="xml:space" />
-            </xsd:complexType>
-          </xsd:element>
-          <xsd:element name="resheader">
-            <xsd:complexType>
-              <xsd:sequence>
-                <xsd:element name="value" type="xsd:string" minOccurs="0" msdata:Ordinal="1" />
-              </xsd:sequence>
-              <xsd:attribute name="name" type="xsd:string" use="required" />
-            </xsd:complexType>
-          </xsd:element>
-        </xsd:choice>
-      </xsd:complexType>
-    </xsd:element>
-  </xsd:schema>
-  <resheader name="resmimetype">
-    <value>text/microsoft-resx</value>
-  </resheader>
-  <resheader name="version">
-    <value>2.0</value>
-  </resheader>
-  <resheader name="reader">
-    <value>System.Resources.ResXResourceReader, System.Windows.Forms, Version=4.0.0.0, Culture=neutral, PublicKeyToken=b77a5c561934e089</value>
-  </resheader>
-  <resheader name="writer">
-    <value>System.Resources.ResXResourceWriter, System.Windows.Forms, Version=4.0.0.0, Culture=neutral, PublicKeyToken=b77a5c561934e089</value>
-  </resheader>
-</root>
-"""
-
-
-# Translate multiple texts
-def translate_batch(texts, target_language):
-    # Add numbering to the texts
-    prompt = (
-        "Translate the following text into the target language. Each translated line must match the numbering and order of the input. "
-        "Preserve newlines within each translated text to maintain the original formatting.\n\n"
-        + "\n".join([f"{i + 1}. {text}" for i, text in enumerate(texts)])
-        + f"\n\nTarget language: '{target_language}'"
+# System prompts used for translation requests; cached translations are keyed by the hash of the active one
+NUMBERED_TRANSLATION_SYSTEM_PROMPT = (
+    "You are an advanced language translation model specializing in accurate and regionally appropriate translations. "
+    "Your task is to translate each input text into the specified target language, ensuring fidelity to the original meaning. "
+    "If the target language includes a localization (e.g., 'Spanish (Mexico)' or 'French (Canada)'), ensure the translation aligns with that regional variant. "
+    "The input will be provided as a numbered list, and your output must preserve this numbering and the exact order of the input texts. "
+    "Each translated line should correspond to the same numbered input line and should not include any additional commentary, explanation, or meta-information. "
+    "The output must be strictly formatted with each translation appearing on a new line, separated by '\\n', and matching the input order exactly. "
+    "Preserve newlines within each translated text to maintain the original formatting. "
+    "For example:\n\n"
+    "Input:\n"
+    "1. Hello, how are you?\n"
+    "   This is a multiline text.\n"
+    "2. Thank you for your help.\n"
+    "Target language: 'Spanish (Mexico)'\n\n"
+    "Output:\n"
+    "1. Hola, ¿cómo estás?\n"
+    "   Este es un texto multilínea.\n"
+    "2. Gracias por tu ayuda."
+)
+JSON_TRANSLATION_SYSTEM_PROMPT = (
+    "You are an advanced language translation model specializing in accurate and regionally appropriate translations. "
+    "Your task is to translate each input text into the specified target language, ensuring fidelity to the original meaning. "
+    "If the target language includes a localization (e.g., 'Spanish (Mexico)' or 'French (Canada)'), ensure the translation aligns with that regional variant. "
+    "The input is a JSON object mapping IDs to texts. Reply with a JSON object that maps every input ID to its translation, "
+    "without adding, dropping or renaming IDs and without any commentary. "
+    "Preserve newlines, placeholders such as {0} and access-key markers such as '&' within each text."
+)
+TRANSLATION_SYSTEM_PROMPT = JSON_TRANSLATION_SYSTEM_PROMPT if TRANSLATION_PROTOCOL == "json" else NUMBERED_TRANSLATION_SYSTEM_PROMPT
+PROMPT_HASH = hash_text(TRANSLATION_SYSTEM_PROMPT)
+# System prompt of the requests that adapt a parent locale's translations to a derived locale
+ADAPTATION_SYSTEM_PROMPT = (
+    "You are an advanced language translation model specializing in regional language variants. "
+    "The input is a JSON object mapping IDs to an English source text and its translation into a closely related base language. "
+    "Adapt each translation to the target language, changing only the spelling, vocabulary, grammar and conventions in which it differs from the base language. "
+    "Reply with a JSON object that maps every input ID to the adapted translation, or to null if the base translation is already correct for the target language, "
+    "without adding, dropping or renaming IDs and without any commentary. "
+    "Preserve newlines, placeholders such as {0} and access-key markers such as '&' within each text."
+)
+
+
+# Derived translations are cached under a prompt hash of their own, covering the translation prompt of the parent
+# translation and the derivation, so they are never served as translations from scratch (e.g. with LOCALE_DERIVATION
+# off) and editing ADAPTATION_SYSTEM_PROMPT invalidates the adapted ones
+def derivation_prompt_hash(method):
+    return hash_text(PROMPT_HASH + (ADAPTATION_SYSTEM_PROMPT if method == "adapt" else method))
+
+
+# Rough token estimate (~4 characters per token) used for the tokens-per-minute budget
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+# Raised in the translation workers once the run is interrupted, instead of sending another request
+class TranslationInterrupted(Exception):
+    pass
+
+
+# Send a chat completion request, throttled by the shared rate limiter and retried on 429/5xx errors.
+# Once stop_event is set no further attempt is made, and a pending retry delay ends early.
+def create_chat_completion(messages, estimated_tokens, language=None, stop_event=None, **options):
+    start = time.perf_counter()
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.acquire(estimated_tokens)
+        if stop_event is not None and stop_event.is_set():
+            raise TranslationInterrupted()
+        try:
+            completion = get_backend().complete(messages, **options)
+            rate_limiter.update_from_headers(completion.headers)
+            telemetry.record_request(language, time.perf_counter() - start, completion.usage, attempt)
+            return completion
+        except BackendError as e:
+            # Client errors other than 429 won't succeed on retry
+            if not e.retryable or attempt == MAX_RETRIES:
+                telemetry.record_request(language, time.perf_counter() - start, None, attempt, ok=False)
+                raise
+
+            retry_after = parse_reset_duration(e.headers.get("retry-after"))
+            delay = backoff_delay(attempt, retry_after=retry_after)
+            if e.status_code == 429:
+                # Hold back the other workers as well instead of letting them hit the limit too
+                rate_limiter.pause(delay)
+                rate_limiter.update_from_headers(e.headers)
+            print(f"Request failed ({e.status_code or 'connection error'}), retrying in {delay:.1f}s...")
+            if stop_event is None:
+                time.sleep(delay)
+            elif stop_event.wait(delay):
+                raise TranslationInterrupted()
+
+
+# Build the chat messages, extra request options and estimated token count for one chunk of texts
+def build_translation_request(texts, target_language, references=None):
+    if TRANSLATION_PROTOCOL == "json":
+        # IDs only need to be unique within the request, so short positional ones keep the prompt small
+        ids = [str(i + 1) for i in range(len(texts))]
+        payload = json.dumps(dict(zip(ids, texts)), ensure_ascii=False)
+        prompt = f"Target language: '{target_language}'\n\n{payload}"
+        options = {"response_format": translation_response_schema(ids)}
+        estimated_tokens = estimate_tokens(TRANSLATION_SYSTEM_PROMPT) + 2 * estimate_tokens(payload)
+    else:
+        # Add numbering to the texts
+        prompt = (
+            "Translate the following text into the target language. Each translated line must match the numbering and order of the input. "
+            "Preserve newlines within each translated text to maintain the original formatting.\n\n"
+            + "\n".join([f"{i + 1}. {text}" for i, text in enumerate(texts)])
+            + f"\n\nTarget language: '{target_language}'"
+        )
+        options = {}
+        # The completion is about as long as the texts being translated
+        estimated_tokens = estimate_tokens(TRANSLATION_SYSTEM_PROMPT) + estimate_tokens(prompt) + sum(estimate_tokens(text) for text in texts)
+
+    messages = [{"role": "system", "content": TRANSLATION_SYSTEM_PROMPT}]
+    reference_message = format_reference_translations(texts, references)
+    if reference_message:
+        messages.append({"role": "user", "content": reference_message})
+        estimated_tokens += estimate_tokens(reference_message)
+    messages.append({"role": "user", "content": prompt})
+    return messages, options, estimated_tokens
+
+
+# Earlier translations of texts similar to the ones in a request, keyed by the ID or number of the text they resemble.
+# They are sent in a message of their own so the system prompt, and with it the translation memory key, stays the same.
+def format_reference_translations(texts, references):
+    matched = {
+        str(i + 1): {"source": references[text][0], "translation": references[text][1]}
+        for i, text in enumerate(texts)
+        if references and text in references
+    }
+    if not matched:
+        return ""
+    return (
+        "For consistency, these are earlier translations of texts similar to some of the following ones, "
+        "keyed by the ID or number of the text they resemble. Keep their wording where the texts agree.\n\n"
+        + json.dumps(matched, ensure_ascii=False)
     )
 
+
+# JSON schema that only accepts an object with exactly the given IDs, each mapped to a value of the given type
+def translation_response_schema(ids, name="translations", value_type="string"):
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {text_id: {"type": value_type} for text_id in ids},
+                "required": list(ids),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Build the chat messages, extra request options and estimated token count for adapting a chunk of base translations.
+# The reply maps every ID to the adapted text or to null, so unchanged entries cost only a few output tokens.
+def build_adaptation_request(texts, base_translations, target_language, base_language):
+    ids = [str(i + 1) for i in range(len(texts))]
+    payload = json.dumps(
+        {text_id: {"source": text, "translation": translation} for text_id, text, translation in zip(ids, texts, base_translations)},
+        ensure_ascii=False,
+    )
+    prompt = f"Target language: '{target_language}'\nBase language: '{base_language}'\n\n{payload}"
+    options = {"response_format": translation_response_schema(ids, name="adaptations", value_type=["string", "null"])}
+    # In the worst case every entry is adapted
+    estimated_tokens = estimate_tokens(ADAPTATION_SYSTEM_PROMPT) + estimate_tokens(payload) + sum(estimate_tokens(translation) for translation in base_translations)
+    messages = [
+        {"role": "system", "content": ADAPTATION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    return messages, options, estimated_tokens
+
+
+# Extract one adapted translation per base translation from a response, keeping the base translations mapped to null.
+# Raises ValueError if the response doesn't contain exactly one entry per base translation.
+def parse_adaptation_response(content, base_translations):
+    ids = [str(i + 1) for i in range(len(base_translations))]
+    try:
+        adaptations = json.loads(content)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid JSON adaptation response: {e}.")
+    if not isinstance(adaptations, dict) or set(adaptations) != set(ids):
+        raise ValueError(f"Mismatched adaptation IDs. Expected {len(ids)}, got {len(adaptations) if isinstance(adaptations, dict) else 0}.")
+    if not all(adaptations[text_id] is None or isinstance(adaptations[text_id], str) for text_id in ids):
+        raise ValueError("Adaptation response contains values that are neither strings nor null.")
+
+    return [translation if adaptations[text_id] is None else adaptations[text_id] for text_id, translation in zip(ids, base_translations)]
+
+
+# Extract one translation per text from a response.
+# Raises ValueError if the response doesn't contain exactly one translation per text.
+def parse_translation_response(content, texts):
+    if TRANSLATION_PROTOCOL == "json":
+        return parse_json_translations(content, texts)
+    return parse_numbered_translations(content, texts)
+
+
+def parse_json_translations(content, texts):
+    ids = [str(i + 1) for i in range(len(texts))]
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini-2024-07-18",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an advanced language translation model specializing in accurate and regionally appropriate translations. "
-                        "Your task is to translate each input text into the specified target language, ensuring fidelity to the original meaning. "
-                        "If the target language includes a localization (e.g., 'Spanish (Mexico)' or 'French (Canada)'), ensure the translation aligns with that regional variant. "
-                        "The input will be provided as a numbered list, and your output must preserve this numbering and the exact order of the input texts. "
-                        "Each translated line should correspond to the same numbered input line and should not include any additional commentary, explanation, or meta-information. "
-                        "The output must be strictly formatted with each translation appearing on a new line, separated by '\\n', and matching the input order exactly. "
-                        "Preserve newlines within each translated text to maintain the original formatting. "
-                        "For example:\n\n"
-                        "Input:\n"
-                        "1. Hello, how are you?\n"
-                        "   This is a multiline text.\n"
-                        "2. Thank you for your help.\n"
-                        "Target language: 'Spanish (Mexico)'\n\n"
-                        "Output:\n"
-                        "1. Hola, ¿cómo estás?\n"
-                        "   Este es un texto multilínea.\n"
-                        "2. Gracias por tu ayuda."
-                    )
-                },
-                {"role": "user", "content": prompt},
-            ],
+        translations = json.loads(content)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid JSON translation response: {e}.")
+    if not isinstance(translations, dict) or set(translations) != set(ids):
+        raise ValueError(f"Mismatched translation IDs. Expected {len(ids)}, got {len(translations) if isinstance(translations, dict) else 0}.")
+    if not all(isinstance(translations[text_id], str) for text_id in ids):
+        raise ValueError("Translation response contains non-string values.")
+
+    return [translations[text_id] for text_id in ids]
+
+
+def parse_numbered_translations(content, texts):
+    # Process response to verify order and handle multiline texts
+    content = content.strip()
+    translated_texts = content.split("\n")
+    cleaned_translations = []
+    current_translation = ""
+    current_number = 1
+    in_translation = False
+
+    for line in translated_texts:
+        if line.strip().startswith(f"{current_number}."):
+            if current_translation:
+                cleaned_translations.append(current_translation.strip())
+            current_translation = line.strip()[len(str(current_number)) + 1:].strip()
+            current_number += 1
+            in_translation = True
+        elif in_translation:
+            current_translation += "\n" + line.strip()
+
+    # Add the last translation
+    if current_translation:
+        cleaned_translations.append(current_translation.strip())
+
+    if len(texts) == 1 and len(cleaned_translations) != 1:
+        # A single text can't be misaligned; its own lines may just look like numbering
+        cleaned_translations = [content[2:].strip() if content.startswith("1.") else content]
+
+    if len(cleaned_translations) != len(texts):
+        raise ValueError(f"Mismatched translation count. Expected {len(texts)}, got {len(cleaned_translations)}.")
+
+    return cleaned_translations
+
+
+# Translate one chunk of texts in a single request
+def translate_chunk(texts, target_language, references=None, stop_event=None):
+    messages, options, estimated_tokens = build_translation_request(texts, target_language, references)
+    completion = create_chat_completion(messages, estimated_tokens, language=target_language, stop_event=stop_event, **options)
+    try:
+        return parse_translation_response(completion.content, texts)
+    except ValueError:
+        telemetry.record_parse_failure(target_language)
+        raise
+
+
+# Split texts into chunks of indexes whose estimated size fits the token budget.
+# Multi-line and long entries (e.g. the system prompts) are always sent on their own.
+def chunk_texts(texts, token_budget=CHUNK_TOKEN_BUDGET, references=None):
+    chunks = []
+    current_chunk = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if "\n" in text or tokens >= min(LONG_ENTRY_TOKENS, token_budget):
+            chunks.append([index])
+            continue
+        # A reference translation travels with its text
+        if references and text in references:
+            tokens += estimate_tokens(references[text][0]) + estimate_tokens(references[text][1])
+        if current_chunk and current_tokens + tokens > token_budget:
+            chunks.append(current_chunk)
+            current_chunk = []
+            current_tokens = 0
+        current_chunk.append(index)
+        current_tokens += tokens
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+# Translate a chunk, bisecting it on a count mismatch so only the failing half is requested again
+def translate_with_bisection(texts, target_language, references=None, stop_event=None):
+    try:
+        return translate_chunk(texts, target_language, references, stop_event)
+    except ValueError as e:
+        if len(texts) == 1:
+            raise
+        print(f"{e} Splitting the {len(texts)}-text {target_language} chunk and retrying.")
+        middle = len(texts) // 2
+        return (
+            translate_with_bisection(texts[:middle], target_language, references, stop_event)
+            + translate_with_bisection(texts[middle:], target_language, references, stop_event)
         )
 
-        # Process response to verify order and handle multiline texts
-        translated_texts = response.choices[0].message.content.strip().split("\n")
-        cleaned_translations = []
-        current_translation = ""
-        current_number = 1
-        in_translation = False
 
-        for line in translated_texts:
-            if line.strip().startswith(f"{current_number}."):
-                if current_translation:
-                    cleaned_translations.append(current_translation.strip())
-                current_translation = line.strip()[len(str(current_number)) + 1:].strip()
-                current_number += 1
-                in_translation = True
-            elif in_translation:
-                current_translation += "\n" + line.strip()
+# Translate multiple texts in token-budgeted chunks, stopping before the next request once stop_event is set.
+# on_chunk(texts, translations) is called with every translated chunk as soon as it arrives.
+# Returns one translation per text, with None for texts whose chunk could not be translated.
+def translate_batch(texts, target_language, references=None, stop_event=None, on_chunk=None):
+    start = time.perf_counter()
+    translations = [None] * len(texts)
+    for chunk in chunk_texts(texts, references=references):
+        chunk_texts_to_translate = [texts[index] for index in chunk]
+        try:
+            chunk_translations = translate_with_bisection(chunk_texts_to_translate, target_language, references, stop_event)
+        except TranslationInterrupted:
+            break
+        except Exception as e:
+            print(f"Error during {target_language} translation: {e}")
+            continue
+        for index, translation in zip(chunk, chunk_translations):
+            translations[index] = translation
+        if on_chunk is not None:
+            on_chunk(chunk_texts_to_translate, chunk_translations)
 
-        # Add the last translation
-        if current_translation:
-            cleaned_translations.append(current_translation.strip())
+    translated_count = sum(translation is not None for translation in translations)
+    telemetry.record_language(target_language, time.perf_counter() - start, len(texts), translated_count)
+    return translations
 
-        if len(cleaned_translations) != len(texts):
-            raise ValueError(f"Mismatched translation count. Expected {len(texts)}, got {len(cleaned_translations)}.")
 
-        return cleaned_translations
+# Adapt a chunk of base translations to a derived locale in a single request
+def adapt_chunk(texts, base_translations, target_language, base_language, stop_event=None):
+    messages, options, estimated_tokens = build_adaptation_request(texts, base_translations, target_language, base_language)
+    completion = create_chat_completion(messages, estimated_tokens, language=target_language, stop_event=stop_event, **options)
+    try:
+        return parse_adaptation_response(completion.content, base_translations)
+    except ValueError:
+        telemetry.record_parse_failure(target_language)
+        raise
 
-    except Exception as e:
-        print(f"Error during {target_language} translation: {e}")
-        return []
 
+# Adapt the base translations of multiple texts in token-budgeted chunks; stop_event and on_chunk work as in
+# translate_batch. Returns one translation per text, with None for texts whose chunk could not be adapted.
+def adapt_batch(texts, base_translations, target_language, base_language, stop_event=None, on_chunk=None):
+    start = time.perf_counter()
+    adapted = [None] * len(texts)
+    # The base translations about double the payload, but the reply is mostly nulls, so the chunks hold as many
+    # texts as translation requests do
+    for chunk in chunk_texts(texts):
+        chunk_texts_to_adapt = [texts[index] for index in chunk]
+        try:
+            chunk_adapted = adapt_chunk(chunk_texts_to_adapt, [base_translations[index] for index in chunk], target_language, base_language, stop_event)
+        except TranslationInterrupted:
+            break
+        except Exception as e:
+            print(f"Error during {target_language} adaptation: {e}")
+            continue
+        for index, translation in zip(chunk, chunk_adapted):
+            adapted[index] = translation
+        if on_chunk is not None:
+            on_chunk(chunk_texts_to_adapt, chunk_adapted)
 
-# Main function
-def generate_resx_files():
-    base_dir = "../"
+    adapted_count = sum(translation is not None for translation in adapted)
+    changed_count = sum(translation is not None and translation != base for translation, base in zip(adapted, base_translations))
+    telemetry.record_language(target_language, time.perf_counter() - start, len(texts), adapted_count)
+    print(f"Adapted {adapted_count} of {len(texts)} {base_language} translations for {target_language}; {changed_count} needed changes.")
+    return adapted
 
-    # Parse RESX_TEMPLATE once
-    resx_template_tree = ET.ElementTree(ET.fromstring(RESX_TEMPLATE))
-    resx_template_root = resx_template_tree.getroot()
 
-    # Group all translation tasks by language
-    translations_by_language = {language: [] for language in language_mapping}
-    key_file_map = {}  # Map to track (language, resource_file, value) to resource key association
+# Find the languages of a run that are derived from a parent language (see locale_derivations).
+# Returns language -> (parent language, method, parent translations of its missing texts from the translation memory).
+def prepare_locale_derivations(missing_by_language, translation_memory, use_cache=True):
+    if not LOCALE_DERIVATION:
+        return {}
+    languages_by_code = {code: language for language, code in language_mapping.items()}
+    derivations = {}
+    for language, missing in missing_by_language.items():
+        derivation = locale_derivations.get(language_mapping[language])
+        if derivation is None:
+            continue
+        parent_code, method = derivation
+        base_translations = translation_memory.get_many(missing, parent_code, MODEL_NAME, PROMPT_HASH) if use_cache else {}
+        derivations[language] = (languages_by_code[parent_code], method, base_translations)
+    return derivations
 
-    # Collect all text for translation
-    for resource_file, keys in resource_files.items():
+
+# Split the missing texts of a derived language into those its parent has translated or is translating in this run,
+# and those that must be translated from scratch
+def split_derivable_texts(language, missing, missing_by_language, derivations):
+    parent_language, _, base_translations = derivations[language]
+    pending = set(missing_by_language.get(parent_language, ()))
+    derivable = [text for text in missing if text in base_translations or text in pending]
+    derivable_texts = set(derivable)
+    return derivable, [text for text in missing if text not in derivable_texts]
+
+
+# The chunks of texts a run sends for one language: ("adapt", texts) for the adaptation requests of a derived language
+# and ("translate", texts) for the texts translated from scratch
+def chunk_language_work(language, missing, missing_by_language, derivations, references=None):
+    to_translate = missing
+    chunks = []
+    if language in derivations:
+        derivable, to_translate = split_derivable_texts(language, missing, missing_by_language, derivations)
+        if derivations[language][1] == "adapt":
+            chunks.extend(("adapt", [derivable[index] for index in chunk]) for chunk in chunk_texts(derivable))
+    chunks.extend(("translate", [to_translate[index] for index in chunk]) for chunk in chunk_texts(to_translate, references=references))
+    return chunks
+
+
+# Produce the translations of a derived language from its parent's: transliterated locally, or adapted by a request
+# that only returns the changed entries. Texts without a parent translation, or whose adaptation failed, are
+# translated from scratch. stop_event and on_chunk work as in translate_batch; on_derived_chunk gets the derived
+# translations instead. Returns one translation per text, with None for texts that could not be translated.
+def derive_translations(texts, base_translations, language, parent_language, method, references=None, stop_event=None, on_chunk=None, on_derived_chunk=None):
+    derivable = [text for text in texts if base_translations.get(text) is not None]
+    if method == "transliterate":
+        transliterate = TRANSLITERATIONS[(language_mapping[parent_language], language_mapping[language])]
+        translations = {text: transliterate(base_translations[text]) for text in derivable}
+        if derivable:
+            print(f"Transliterated {len(derivable)} {parent_language} translations for {language}.")
+            if on_derived_chunk is not None:
+                on_derived_chunk(derivable, [translations[text] for text in derivable])
+    else:
+        adapted = adapt_batch(derivable, [base_translations[text] for text in derivable], language, parent_language, stop_event, on_derived_chunk) if derivable else []
+        translations = {text: translation for text, translation in zip(derivable, adapted) if translation is not None}
+
+    from_scratch = [text for text in texts if text not in translations]
+    if from_scratch and not (stop_event is not None and stop_event.is_set()):
+        translations.update(zip(from_scratch, translate_batch(from_scratch, language, references, stop_event, on_chunk)))
+    return [translations.get(text) for text in texts]
+
+
+# The manifest maps resource_file -> language code -> key -> source-text hash of the last written translation
+def load_manifest(save_bootstrapped=True):
+    if not os.path.exists(MANIFEST_PATH):
+        # Without a manifest every existing translation would count as added and be requested again
+        manifest = bootstrap_manifest()
+        file_count = sum(len(codes) for codes in manifest.values())
+        if save_bootstrapped:
+            save_manifest(manifest)
+            print(f"No {MANIFEST_PATH} found; created it from {file_count} existing localized files.")
+        else:
+            print(f"No {MANIFEST_PATH} found; using one built from {file_count} existing localized files.")
+        return manifest
+    with open(MANIFEST_PATH, encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+
+# Build a manifest from the localized RESX files on disk, treating every entry they hold as translated from the
+# current neutral text, as seed-cache does. Used on a fresh clone, where there is no manifest yet.
+def bootstrap_manifest(base_dir="../"):
+    manifest = {}
+    codes = set(language_mapping.values())
+    for resource_file, localized_files in find_localized_resx_files(base_dir, resource_files).items():
+        localized_files = {code: file_path for code, file_path in localized_files.items() if code in codes}
+        if not localized_files:
+            continue
+        source_values = read_resx_values(os.path.join(base_dir, f"{resource_file}.resx"), resource_files[resource_file])
+        source_hashes = {key: hash_text(value) for key, value in source_values.items()}
+        for code, file_path in localized_files.items():
+            translated_keys = read_resx_values(file_path, source_hashes)
+            manifest.setdefault(resource_file, {})[code] = {key: source_hashes[key] for key in translated_keys}
+    return manifest
+
+
+def save_manifest(manifest):
+    temp_path = f"{MANIFEST_PATH}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(temp_path, MANIFEST_PATH)
+
+
+# Compare the previous and current {key: source-text hash} maps of one file
+def compute_key_delta(previous_hashes, current_hashes):
+    added = [key for key in current_hashes if key not in previous_hashes]
+    changed = [key for key, source_hash in current_hashes.items() if key in previous_hashes and previous_hashes[key] != source_hash]
+    removed = [key for key in previous_hashes if key not in current_hashes]
+    return added, changed, removed
+
+
+# Resolve language codes or names (case-insensitive) to a subset of language_mapping
+def resolve_languages(selectors):
+    selected = {}
+    for selector in selectors:
+        matches = {
+            language: code for language, code in language_mapping.items()
+            if selector.lower() in (language.lower(), code.lower())
+        }
+        if not matches:
+            raise ValueError(f"Unknown language '{selector}'.")
+        selected.update(matches)
+    return selected
+
+
+# Resolve resource file names such as "Forge" or "Forge.resx" to a subset of resource_files
+def resolve_resource_files(selectors):
+    selected = {}
+    for selector in selectors:
+        name = selector[:-len(".resx")] if selector.endswith(".resx") else selector
+        if name not in resource_files:
+            raise ValueError(f"Unknown resource file '{selector}'.")
+        selected[name] = resource_files[name]
+    return selected
+
+
+# Collect the keys that were added or changed since the last run, grouped by language as
+# (resource_file, key, value) entries, and the keys that were removed, grouped by (resource_file, code).
+# Keys that share the same source text keep their own entry.
+# The work can be limited to some languages, resource files and keys; force=True includes every selected key.
+# repairs (see load_repairs) replaces change detection with the exact keys a verify report flagged.
+def collect_translation_work(manifest, base_dir="../", languages=None, files=None, keys=None, force=False, repairs=None):
+    languages = language_mapping if languages is None else languages
+    files = resource_files if files is None else files
+    translations_by_language = {language: [] for language in languages}
+    removals_by_file = {}
+    source_values = {}
+
+    for resource_file, file_keys in files.items():
         base_file_path = os.path.join(base_dir, f"{resource_file}.resx")
-        tree = ET.parse(base_file_path)
-        root = tree.getroot()
-
-        for data in root.findall("data"):
-            name = data.attrib.get("name")
-            if name in keys:
-                value = data.find("value").text
-                if value:  # Ensure there is a value to translate
-                    for language, code in language_mapping.items():
-                        translations_by_language[language].append((resource_file, value))
-                        key_file_map[(language, resource_file, value)] = name
-
-    # Perform batch translation for each language
+        values = read_resx_values(base_file_path, file_keys)
+        source_values[resource_file] = values
+        current_hashes = {key: hash_text(value) for key, value in values.items()}
+
+        totals = [0, 0, 0]
+        for language, code in languages.items():
+            previous_hashes = manifest.get(resource_file, {}).get(code, {})
+            # A deleted localized file has to be regenerated in full
+            if not os.path.exists(os.path.join(base_dir, f"{resource_file}.{code}.resx")):
+                previous_hashes = {}
+
+            added, changed, removed = compute_key_delta(previous_hashes, current_hashes)
+            if force:
+                changed = [key for key in current_hashes if key not in added]
+            if repairs is not None:
+                repair = repairs.get((resource_file, code), {})
+                added = []
+                changed = [key for key in current_hashes if key in repair.get("retranslate", ())]
+                removed = sorted(repair.get("remove", ()))
+            if keys is not None:
+                added, changed, removed = ([key for key in delta if key in keys] for delta in (added, changed, removed))
+
+            for key in added + changed:
+                translations_by_language[language].append((resource_file, key, values[key]))
+            if removed:
+                removals_by_file[(resource_file, code)] = removed
+            totals = [totals[0] + len(added), totals[1] + len(changed), totals[2] + len(removed)]
+        print(f"{resource_file}.resx: {totals[0]} added, {totals[1]} changed, {totals[2]} removed translations.")
+
+    return translations_by_language, removals_by_file, source_values
+
+
+# Look up every text in the translation memory. Returns the per-entry results (None where missing)
+# and, per language, the distinct texts that still need to be translated.
+def lookup_cached_translations(translations_by_language, translation_memory, use_cache=True):
     translated_results = {}
+    missing_by_language = {}
     for language, texts_to_translate in translations_by_language.items():
         if not texts_to_translate:
-            print(f"No text to translate for {language}.")
             continue
-        try:
-            # Extract only the text values for translation
-            texts = [value for _, value in texts_to_translate]
-            translated_results[language] = translate_batch(texts, language)
-        except Exception as e:
-            print(f"Error during translation for {language}: {e}")
-            translated_results[language] = []
-
-    # Write translated RESX files
-    for (language, resource_file, original_text), key in key_file_map.items():
-        translated_texts = translated_results.get(language, [])
-        if not translated_texts:
-            print(f"Skipping {resource_file} for {language} due to missing translations.")
-            continue
-
+        # Extract only the text values for translation
+        texts = [value for _, _, value in texts_to_translate]
         code = language_mapping[language]
-        translated_file_path = os.path.join(base_dir, f"{resource_file}.{code}.resx")
+        cached = translation_memory.get_many(texts, code, MODEL_NAME, PROMPT_HASH) if use_cache else {}
+        derivation = locale_derivations.get(code) if LOCALE_DERIVATION else None
+        if use_cache and derivation is not None:
+            uncached = [text for text in texts if text not in cached]
+            cached.update(translation_memory.get_many(uncached, code, MODEL_NAME, derivation_prompt_hash(derivation[1])))
+        translated_results[language] = [cached.get(text) for text in texts]
+
+        # Each distinct source text is sent once and fanned back out to every key that uses it
+        missing = list(dict.fromkeys(text for text in texts if text not in cached))
+        if missing:
+            missing_by_language[language] = missing
 
-        # Read or create new RESX content
-        if os.path.exists(translated_file_path):
-            tree = ET.parse(translated_file_path)
-            root = tree.getroot()
+    similar_by_language = find_similar_translations(missing_by_language, translation_memory) if use_cache and FUZZY_MATCHING else {}
+    for language, similar in similar_by_language.items():
+        # Near-identical texts with the same placeholders reuse the earlier translation as is
+        reused = {
+            text: translation for text, (source, translation, similarity) in similar.items()
+            if similarity >= FUZZY_REUSE_THRESHOLD and find_placeholders(text) == find_placeholders(source)
+        }
+        if not reused:
+            continue
+        results = translated_results[language]
+        for index, (_, _, text) in enumerate(translations_by_language[language]):
+            if text in reused:
+                results[index] = reused[text]
+        missing = [text for text in missing_by_language[language] if text not in reused]
+        if missing:
+            missing_by_language[language] = missing
         else:
-            # Clone the template root for a new file
-            root = ET.Element("root")
-            for child in resx_template_root:
-                root.append(child)
+            del missing_by_language[language]
+    return translated_results, missing_by_language, similar_by_language
 
-        # Add translations
-        texts_to_translate = [value for _, value in translations_by_language[language]]
-        try:
-            translated_index = texts_to_translate.index(original_text)
-            translated_value = translated_results[language][translated_index]
-        except ValueError:
-            print(f"Original text '{original_text}' not found in translations for {language}.")
+
+# Match the texts missing from the translation memory against the similar texts it already holds.
+# Returns language -> text -> (similar source text, its translation, similarity) for the best match of every text
+# that has one above FUZZY_REFERENCE_THRESHOLD or FUZZY_REUSE_THRESHOLD.
+def find_similar_translations(missing_by_language, translation_memory):
+    texts = {text for missing in missing_by_language.values() for text in missing}
+    if not texts:
+        return {}
+    index = get_similarity_index(translation_memory)
+    # The source texts are shared by all languages, so each text is looked up once; the few best matches are kept
+    # because the closest one may not be translated into every language yet
+    min_similarity = min(FUZZY_REFERENCE_THRESHOLD, FUZZY_REUSE_THRESHOLD)
+    matches = {text: index.query(text, limit=3, min_similarity=min_similarity) for text in texts}
+
+    similar_by_language = {}
+    for language, missing in missing_by_language.items():
+        sources = {source for text in missing for source, _ in matches[text]}
+        if not sources:
             continue
+        translations = translation_memory.get_many(sources, language_mapping[language], MODEL_NAME, PROMPT_HASH)
+        similar = {}
+        for text in missing:
+            for source, similarity in matches[text]:
+                if source in translations:
+                    similar[text] = (source, translations[source], similarity)
+                    break
+        if similar:
+            similar_by_language[language] = similar
+    return similar_by_language
+
+
+# Bring the similarity index of the translation memory's source texts up to date and return it. The index is kept for
+# the rest of the process, which matters in watch mode, and saved to SIMILARITY_INDEX_PATH for later runs; either way it
+# records the last row it covers, so only the rows stored since then are indexed. Rows are never deleted, so fewer rows
+# than recorded mean the translation memory was replaced, and the index is built from scratch. Nothing is saved for a
+# read-only translation memory.
+def get_similarity_index(translation_memory):
+    global similarity_index
+    source = {"translation_memory": os.path.abspath(translation_memory.path), "model": MODEL_NAME, "prompt_hash": PROMPT_HASH}
+    row_count, last_rowid = translation_memory.count(), translation_memory.last_rowid()
+
+    def is_current(state):
+        return (
+            all(state.get(name) == value for name, value in source.items())
+            and state["row_count"] <= row_count and state["last_rowid"] <= last_rowid
+        )
+
+    if similarity_index is None or not is_current(similarity_index[1]):
+        saved = SimilarityIndex.load(SIMILARITY_INDEX_PATH)
+        similarity_index = saved if saved and is_current(saved[1]) else (SimilarityIndex(), {**source, "row_count": 0, "last_rowid": 0})
+
+    index, state = similarity_index
+    if (state["row_count"], state["last_rowid"]) != (row_count, last_rowid):
+        for text in translation_memory.source_texts(MODEL_NAME, PROMPT_HASH, after_rowid=state["last_rowid"]):
+            index.add(text)
+        state = {**source, "row_count": row_count, "last_rowid": last_rowid}
+        if not translation_memory.read_only:
+            index.save(SIMILARITY_INDEX_PATH, state)
+        similarity_index = (index, state)
+    return index
 
-        # Ensure the key is unique in the file
-        existing_data = root.find(f"./data[@name='{key}']")
-        if existing_data is None:
-            new_data = ET.SubElement(root, "data", {"name": key})
-            ET.SubElement(new_data, "value").text = translated_value
 
-        # Save the RESX file
-        tree = ET.ElementTree(root)
+# Replay the journal of an interrupted run into the manifest. Returns the (resource_file, code) pairs it completed
+# whose keys still have the same source text, so a resumed run can skip them.
+def replay_journal(journal, manifest, source_values):
+    completed = set()
+    for entry in journal.read():
+        resource_file, code = entry["file"], entry["code"]
+        file_hashes = manifest.setdefault(resource_file, {}).setdefault(code, {})
+        file_hashes.update(entry["hashes"])
+        for key in entry["removed"]:
+            file_hashes.pop(key, None)
+        current_values = source_values.get(resource_file, {})
+        if all(key in current_values and hash_text(current_values[key]) == source_hash for key, source_hash in entry["hashes"].items()):
+            completed.add((resource_file, code))
+    return completed
+
+
+# Write the finished translations and removals of one language, record the written files in the manifest
+# and the journal, and return the (resource_file, code) pairs that were newly created.
+def write_language_results(language, texts_to_translate, results, removals_by_file, source_values, manifest, journal, base_dir="../"):
+    code = language_mapping[language]
+    translations_by_file = {}
+    if texts_to_translate and not any(results):
+        print(f"Skipping {language} due to missing translations.")
+    else:
+        for (resource_file, key, _), translated_value in zip(texts_to_translate, results):
+            if translated_value is None:
+                print(f"Skipping '{key}' in {resource_file} for {language} due to a missing translation.")
+                continue
+            translations_by_file.setdefault((resource_file, code), {})[key] = translated_value
+
+    removals = {pair: removed for pair, removed in removals_by_file.items() if pair[1] == code}
+    new_files = {pair for pair in translations_by_file if not os.path.exists(os.path.join(base_dir, f"{pair[0]}.{pair[1]}.resx"))}
+    written_files = write_translations(translations_by_file, base_dir, removals)
+
+    # Record what was written, so the next run only picks up new changes
+    for resource_file, code in sorted(written_files):
+        hashes = {
+            key: hash_text(source_values[resource_file][key])
+            for key in translations_by_file.get((resource_file, code), {})
+        }
+        removed = removals.get((resource_file, code), [])
+        file_hashes = manifest.setdefault(resource_file, {}).setdefault(code, {})
+        file_hashes.update(hashes)
+        for key in removed:
+            file_hashes.pop(key, None)
+        journal.append({"file": resource_file, "code": code, "hashes": hashes, "removed": removed})
+    return new_files & written_files
+
+
+# Main function. With offline=True, texts missing from the translation memory are skipped instead of requested.
+# The run can be limited to some languages, resource files and keys (see collect_translation_work);
+# force=True and repairs also bypass the translation memory. Returns the (resource_file, code) pairs of newly created files.
+# Each language is written as soon as its translations arrive, and every written file is journaled until the run
+# completes; resume=True continues an interrupted run by skipping the files its journal lists.
+def generate_resx_files(offline=False, languages=None, files=None, keys=None, force=False, repairs=None, resume=False):
+    base_dir = "../"
+    telemetry.start_run()
+    manifest = load_manifest()
+    translations_by_language, removals_by_file, source_values = collect_translation_work(
+        manifest, base_dir, languages=languages, files=files, keys=keys, force=force, repairs=repairs,
+    )
+
+    journal = RunJournal(JOURNAL_PATH)
+    if resume:
+        completed = replay_journal(journal, manifest, source_values)
+        print(f"Resuming: {len(completed)} files were completed by the interrupted run.")
+        translations_by_language = {
+            language: [entry for entry in entries if (entry[0], language_mapping[language]) not in completed]
+            for language, entries in translations_by_language.items()
+        }
+        removals_by_file = {pair: removed for pair, removed in removals_by_file.items() if pair not in completed}
+    elif journal.exists():
+        print("Discarding the journal of an interrupted run; use --resume to continue it instead.")
+        journal.clear()
+
+    # Only texts missing from the translation memory are sent to the API
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+    translated_results, missing_by_language, similar_by_language = lookup_cached_translations(
+        translations_by_language, translation_memory, use_cache=not force and repairs is None,
+    )
+    cached_languages = [language for language in translated_results if language not in missing_by_language]
+    if cached_languages:
+        print(f"{len(cached_languages)} languages were served entirely from the translation memory.")
+    if similar_by_language:
+        referenced = sum(len(similar.keys() & set(missing_by_language.get(language, ()))) for language, similar in similar_by_language.items())
+        reused = sum(len(similar) for similar in similar_by_language.values()) - referenced
+        print(f"Similar texts in the translation memory: {reused} translations reused, {referenced} sent as references.")
+    if offline:
+        missing_by_language = {}
+    derivations = prepare_locale_derivations(missing_by_language, translation_memory, use_cache=not force and repairs is None)
+
+    # Split each language's cost across resource files by their share of the source text
+    for language, missing in missing_by_language.items():
+        missing_texts = set(missing)
+        characters = {}
+        for resource_file, _, value in translations_by_language[language]:
+            if value in missing_texts:
+                characters[resource_file] = characters.get(resource_file, 0) + len(value)
+        total_characters = sum(characters.values())
+        telemetry.record_resource_file_share(language, {resource_file: count / total_characters for resource_file, count in characters.items()})
+
+    # Translator threads hand each finished language to this thread through a bounded queue, so results are
+    # written while other languages are still in flight and at most a few unwritten languages are held in memory
+    results_queue = queue.Queue(maxsize=MAX_CONCURRENT_LANGUAGES)
+    stop = threading.Event()
+    # Parents translated by this run hand their new translations to the languages derived from them
+    parent_finished = {parent_language: threading.Event() for parent_language, _, _ in derivations.values() if parent_language in missing_by_language}
+    parent_translations = {}
+
+    # Workers store every translated chunk right away, so an interrupted run keeps what it already paid for
+    def store_chunk(language, prompt_hash=PROMPT_HASH):
+        code = language_mapping[language]
+        return lambda texts, translations: translation_memory.put_many(zip(texts, translations), code, MODEL_NAME, prompt_hash)
+
+    def translate_language(language, missing):
+        try:
+            if language in derivations:
+                parent_language, method, base_translations = derivations[language]
+                if parent_language in parent_finished:
+                    while not parent_finished[parent_language].wait(0.5):
+                        if stop.is_set():
+                            return
+                    base_translations = {**base_translations, **parent_translations[parent_language]}
+                translations = derive_translations(
+                    missing, base_translations, language, parent_language, method, similar_by_language.get(language), stop,
+                    store_chunk(language), store_chunk(language, derivation_prompt_hash(method)),
+                )
+            else:
+                translations = translate_batch(missing, language, similar_by_language.get(language), stop, store_chunk(language))
+            result = (language, missing, translations, None)
+        except Exception as e:
+            result = (language, missing, None, e)
+        if language in parent_finished:
+            parent_translations[language] = {text: translation for text, translation in zip(missing, result[2] or []) if translation is not None}
+            parent_finished[language].set()
+        while not stop.is_set():
+            try:
+                results_queue.put(result, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    created_files = set()
+    codes_with_removals = {code for _, code in removals_by_file}
+    ready_languages = [
+        language for language, entries in translations_by_language.items()
+        if language not in missing_by_language and (entries or language_mapping[language] in codes_with_removals)
+    ]
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LANGUAGES)
+    try:
+        # Derived languages are queued last, so the parents they wait for have already started
+        for language, missing in sorted(missing_by_language.items(), key=lambda item: item[0] in derivations):
+            executor.submit(translate_language, language, missing)
+
+        # Languages that need no requests can be written right away
+        for language in ready_languages:
+            created_files |= write_language_results(
+                language, translations_by_language[language], translated_results.pop(language, []),
+                removals_by_file, source_values, manifest, journal, base_dir,
+            )
+
+        for _ in range(len(missing_by_language)):
+            language, missing, translations, error = results_queue.get()
+            if error is not None:
+                print(f"Error during translation for {language}: {error}")
+            else:
+                new_translations = {text: translation for text, translation in zip(missing, translations) if translation is not None}
+                translated_count = sum(translation is not None for translation in translations)
+                print(f"Translated {translated_count} of {len(missing)} texts for {language}.")
+                results = translated_results[language]
+                for index, (_, _, text) in enumerate(translations_by_language[language]):
+                    if results[index] is None:
+                        results[index] = new_translations.get(text)
+
+            created_files |= write_language_results(
+                language, translations_by_language[language], translated_results.pop(language),
+                removals_by_file, source_values, manifest, journal, base_dir,
+            )
+    except BaseException:
+        # Workers send no further request once stop is set; the requests in flight are waited for, so that their
+        # translations reach the translation memory before it is closed
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        journal.close()
+        translation_memory.close()
+        print(f"Run interrupted; {JOURNAL_PATH} lists the finished files. Run again with --resume to continue.")
+        raise
+    executor.shutdown()
+    translation_memory.close()
+
+    # The manifest now holds everything the journal recorded
+    save_manifest(manifest)
+    journal.clear()
+
+    telemetry.finish_run()
+    summary = telemetry.write_reports(TELEMETRY_DIR)
+    totals = summary["totals"]
+    print(
+        f"Run finished in {summary['duration_seconds']}s: {totals['requests']} requests, {totals['retries']} retries, "
+        f"{totals['parse_failures']} parse failures, {totals['prompt_tokens']} prompt and {totals['completion_tokens']} completion tokens, "
+        f"{totals['files_written']} files written, estimated cost ${totals['cost_usd']:.4f}. Details in {TELEMETRY_DIR}/."
+    )
+    return created_files
+
+
+# Write one OpenAI Batch API request per chunk of texts missing from the translation memory.
+# The chunk texts are kept next to the requests file so the results can be ingested later.
+def write_batch_requests(requests_path, languages=None, files=None, keys=None):
+    manifest = load_manifest()
+    translations_by_language, _, _ = collect_translation_work(manifest, languages=languages, files=files, keys=keys)
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+    _, missing_by_language, similar_by_language = lookup_cached_translations(translations_by_language, translation_memory)
+    translation_memory.close()
+
+    chunks = {}
+    with open(requests_path, "w", encoding="utf-8") as requests_file:
+        for language, missing in missing_by_language.items():
+            code = language_mapping[language]
+            references = similar_by_language.get(language)
+            for chunk_index, chunk in enumerate(chunk_texts(missing, references=references)):
+                texts = [missing[index] for index in chunk]
+                messages, options, _ = build_translation_request(texts, language, references)
+                custom_id = f"{code}:{chunk_index}"
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {"model": MODEL_NAME, "messages": messages, **options},
+                }
+                requests_file.write(json.dumps(request, ensure_ascii=False) + "\n")
+                chunks[custom_id] = {"code": code, "texts": texts}
+
+    with open(f"{requests_path}.chunks.json", "w", encoding="utf-8") as chunks_file:
+        json.dump({"model": MODEL_NAME, "prompt_hash": PROMPT_HASH, "chunks": chunks}, chunks_file, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(chunks)} batch requests to {requests_path}.")
+
+
+# Load a Batch API results file into the translation memory, then write the RESX files without any API calls
+def ingest_batch_results(results_path, requests_path):
+    with open(f"{requests_path}.chunks.json", encoding="utf-8") as chunks_file:
+        batch = json.load(chunks_file)
+    if batch["model"] != MODEL_NAME or batch["prompt_hash"] != PROMPT_HASH:
+        raise ValueError("The batch was created with a different model or system prompt.")
+
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+    ingested = 0
+    with open(results_path, encoding="utf-8") as results_file:
+        for line in results_file:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            custom_id = result.get("custom_id")
+            chunk = batch["chunks"].get(custom_id)
+            response = result.get("response") or {}
+            if chunk is None:
+                print(f"Skipping unknown batch request '{custom_id}'.")
+                continue
+            if result.get("error") or response.get("status_code") != 200:
+                print(f"Skipping failed batch request '{custom_id}': {result.get('error')}")
+                continue
+
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                translations = parse_translation_response(content, chunk["texts"])
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"Skipping batch request '{custom_id}': {e}")
+                continue
+            translation_memory.put_many(zip(chunk["texts"], translations), chunk["code"], MODEL_NAME, PROMPT_HASH)
+            ingested += 1
+    translation_memory.close()
+    print(f"Ingested {ingested} of {len(batch['chunks'])} batch requests.")
+
+    if generate_resx_files(offline=True):
+        add_resx_to_csproj()
+
+
+# Apply all translations and removals for each (resource_file, code) pair in memory and write every file once.
+# Returns the pairs whose file is now up to date.
+def write_translations(translations_by_file, base_dir="../", removals_by_file=None):
+    removals_by_file = removals_by_file or {}
+    written_files = set()
+    for resource_file, code in list(translations_by_file) + [pair for pair in removals_by_file if pair not in translations_by_file]:
+        file_name = f"{resource_file}.{code}.resx"
+        translated_file_path = os.path.join(base_dir, file_name)
+
+        # Read the existing file, or start from a fresh copy of the template
+        existed = os.path.exists(translated_file_path)
+        if not existed and (resource_file, code) not in translations_by_file:
+            continue
+        root = load_resx_root(translated_file_path)
+        changed = set_resx_values(root, translations_by_file.get((resource_file, code), {}))
+        changed += remove_resx_values(root, removals_by_file.get((resource_file, code), []))
+        if not changed and existed:
+            written_files.add((resource_file, code))
+            continue
+
         try:
-            tree.write(translated_file_path, encoding="utf-8", xml_declaration=True)
-            print(f"Created/Updated {resource_file}.{code}.resx")
+            write_resx_atomic(root, translated_file_path)
+            written_files.add((resource_file, code))
+            telemetry.record_file_written(resource_file, code)
+            print(f"Created/Updated {file_name}")
         except Exception as save_error:
-            print(f"Error saving {resource_file}.{code}.resx: {save_error}")
+            print(f"Error saving {file_name}: {save_error}")
+    return written_files
+
+
+# Seed the translation memory and the manifest from the existing localized RESX files so adopting them costs no API calls
+def seed_translation_memory():
+    base_dir = "../"
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+    manifest = load_manifest()
+
+    for resource_file, keys in resource_files.items():
+        base_file_path = os.path.join(base_dir, f"{resource_file}.resx")
+        source_texts = read_resx_values(base_file_path, keys)
+
+        for language, code in language_mapping.items():
+            translated_file_path = os.path.join(base_dir, f"{resource_file}.{code}.resx")
+            if not os.path.exists(translated_file_path):
+                continue
+
+            translated_texts = read_resx_values(translated_file_path, source_texts)
+            # Translations the manifest knows to be of an older neutral text are stale; pairing them with the current
+            # text would cache them and mark them up to date. The others are treated as up to date.
+            previous_hashes = manifest.get(resource_file, {}).get(code, {})
+            source_hashes = {name: hash_text(source_texts[name]) for name in translated_texts}
+            current = {name: translation for name, translation in translated_texts.items() if previous_hashes.get(name, source_hashes[name]) == source_hashes[name]}
+            entries = [(source_texts[name], translation) for name, translation in current.items()]
+            translation_memory.put_many(entries, code, MODEL_NAME, PROMPT_HASH)
+            # Only keys missing from the manifest are added; existing entries keep their hash
+            if current:
+                file_hashes = manifest.setdefault(resource_file, {}).setdefault(code, {})
+                for name in current:
+                    file_hashes.setdefault(name, source_hashes[name])
+            skipped = len(translated_texts) - len(current)
+            print(f"Seeded {len(entries)} translations from {resource_file}.{code}.resx" + (f", skipped {skipped} of changed texts" if skipped else ""))
 
+    save_manifest(manifest)
+    print(f"Translation memory now holds {translation_memory.count()} entries.")
+    translation_memory.close()
 
-def add_resx_to_csproj():
-    # Path configurations can still be defined locally or set globally
+
+# Add the localized RESX files that exist on disk to TextCraft.csproj and remove the items of deleted ones.
+# The project file is only rewritten when something changed, keeping its formatting and item order.
+# The pseudo-locale files are git-ignored, so the tracked project only embeds them with include_pseudo_locales.
+def add_resx_to_csproj(dry_run=False, include_pseudo_locales=False):
     csproj_path = os.path.join('../', 'TextCraft.csproj')
     resx_directory = '../'
 
-    # Load the .csproj file as an XML tree
-    tree = ET.parse(csproj_path)
-    root = tree.getroot()
-    
-    # Define the XML namespace and register it
-    namespace = {'msbuild': 'http://schemas.microsoft.com/developer/msbuild/2003'}
-    ET.register_namespace('', 'http://schemas.microsoft.com/developer/msbuild/2003')
-
-    # Find all existing EmbeddedResource elements
-    embedded_resources = root.findall('.//msbuild:EmbeddedResource', namespace)
-    existing_resx_files = {elem.attrib['Include'] for elem in embedded_resources}
-
-    # Find all resx files in the specified directory
-    resx_files = [f for f in os.listdir(resx_directory) if f.endswith('.resx')]
-
-    # Filter the resx files to match the pattern "{resource_file}.{code}.resx"
-    valid_resx_files = set()
-
-    for resource_file in resource_files:
-        for language_code in language_mapping.values():
-            valid_resx_files.add(f"{resource_file}.{language_code}.resx")
-
-    # For each resx file, check if it's already referenced in the .csproj file and matches the valid pattern
-    for resx_file in resx_files:
-        if resx_file not in existing_resx_files and resx_file in valid_resx_files:
-            # Create a new EmbeddedResource element
-            new_resource = ET.Element('EmbeddedResource', {'Include': resx_file})
-            # Optionally add DependentUpon if applicable (assumes naming consistency)
-            file_base_name = os.path.splitext(resx_file)[0].split('.')[0]  # Get the base name without language code
-            ET.SubElement(new_resource, 'DependentUpon').text = f"{file_base_name}.cs"
-            
-            # Append the new element to the node (usually inside an ItemGroup)
-            # Assuming the first ItemGroup is where resources are added
-            item_group = root.find('msbuild:ItemGroup', namespace)
-            if item_group is None:
-                item_group = ET.SubElement(root, 'ItemGroup')
-            item_group.append(new_resource)
-
-    # Write the modified .csproj file back to disk
-    tree.write(csproj_path, encoding='utf-8', xml_declaration=True)
-    print(f"Updated {csproj_path} with new .resx files.")
+    pseudo_locales = [PSEUDO_LOCALE, MIRRORED_PSEUDO_LOCALE]
+    if include_pseudo_locales:
+        language_codes, excluded_language_codes = list(language_mapping.values()) + pseudo_locales, []
+    else:
+        language_codes, excluded_language_codes = list(language_mapping.values()), pseudo_locales
+    added, removed = sync_csproj(csproj_path, resx_directory, resource_files, language_codes, dry_run, excluded_language_codes)
+    if not added and not removed:
+        print(f"{csproj_path} is up to date.")
+        return added, removed
+
+    verb = "Would update" if dry_run else "Updated"
+    print(f"{verb} {csproj_path}: {len(added)} .resx files added, {len(removed)} removed.")
+    for file_name in added:
+        print(f"  + {file_name}")
+    for file_name in removed:
+        print(f"  - {file_name}")
+    return added, removed
+
+
+# Show what a translate run would do, without sending any requests or writing any files
+def print_status(languages=None, files=None, keys=None):
+    manifest = load_manifest(save_bootstrapped=False)
+    translations_by_language, removals_by_file, _ = collect_translation_work(manifest, languages=languages, files=files, keys=keys)
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH, read_only=True)
+    translated_results, missing_by_language, similar_by_language = lookup_cached_translations(translations_by_language, translation_memory)
+    derivations = prepare_locale_derivations(missing_by_language, translation_memory)
+    translation_memory.close()
+
+    pending = sum(len(entries) for entries in translations_by_language.values())
+    cached = sum(sum(result is not None for result in results) for results in translated_results.values())
+    requests = sum(
+        len(chunk_language_work(language, missing, missing_by_language, derivations, similar_by_language.get(language)))
+        for language, missing in missing_by_language.items()
+    )
+    print(f"{pending} pending translations, {cached} available from the translation memory, {len(removals_by_file)} files with removed keys.")
+    print(f"{sum(len(missing) for missing in missing_by_language.values())} texts in {len(missing_by_language)} languages need about {requests} requests.")
+    for language, missing in missing_by_language.items():
+        derived = f", derived from {derivations[language][0]} ({derivations[language][1]})" if language in derivations else ""
+        print(f"  {language} ({language_mapping[language]}): {len(missing)} texts{derived}")
+
+
+# Estimate what a translate run would do without sending anything: the (language, file, key) work items,
+# the requests at the configured batch size, input/output tokens, cost and wall time at the configured
+# concurrency and rate limits. Returns the plan as a dict.
+def plan_translations(languages=None, files=None, keys=None, force=False, output_format="text", output_path=None, show_items=True):
+    # Keep stdout parseable when the JSON plan is printed there
+    with contextlib.redirect_stdout(sys.stderr if output_format == "json" else sys.stdout):
+        manifest = load_manifest(save_bootstrapped=False)
+        translations_by_language, removals_by_file, _ = collect_translation_work(manifest, languages=languages, files=files, keys=keys, force=force)
+        count_tokens, tokenizer_name = load_tokenizer(TOKENIZER, MODEL_NAME)
+    translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH, read_only=True)
+    translated_results, missing_by_language, similar_by_language = lookup_cached_translations(translations_by_language, translation_memory, use_cache=not force)
+    derivations = prepare_locale_derivations(missing_by_language, translation_memory, use_cache=not force)
+    translation_memory.close()
+
+    items = [
+        {"language": language_mapping[language], "file": resource_file, "key": key, "cached": cached is not None}
+        for language, entries in translations_by_language.items()
+        for (resource_file, key, _), cached in zip(entries, translated_results.get(language, []))
+    ]
+
+    # Build exactly the requests a run would send, and count their tokens
+    language_plans = {}
+    limiter_tokens = 0
+    for language, missing in missing_by_language.items():
+        language_plan = {"texts": len(missing), "requests": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+        if language in derivations:
+            parent_language, method, base_translations = derivations[language]
+            language_plan["derived_from"] = language_mapping[parent_language]
+            language_plan["derivation"] = method
+        references = similar_by_language.get(language)
+        for kind, texts in chunk_language_work(language, missing, missing_by_language, derivations, references):
+            if kind == "adapt":
+                # Texts the parent only translates during the run are sized by their source text, and the reply is
+                # estimated as if no entry needed changes
+                messages, options, estimated_tokens = build_adaptation_request(texts, [base_translations.get(text, text) for text in texts], language, parent_language)
+                reply = json.dumps({str(i + 1): None for i in range(len(texts))})
+            else:
+                messages, options, estimated_tokens = build_translation_request(texts, language, references)
+                # The reply has the same shape as the request payload
+                if "response_format" in options:
+                    reply = json.dumps({str(i + 1): text for i, text in enumerate(texts)}, ensure_ascii=False)
+                else:
+                    reply = "\n".join(f"{i + 1}. {text}" for i, text in enumerate(texts))
+            input_tokens = sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+            if "response_format" in options:
+                input_tokens += count_tokens(json.dumps(options["response_format"]))
+            output_tokens = count_tokens(reply)
+            language_plan["requests"] += 1
+            language_plan["input_tokens"] += input_tokens
+            language_plan["output_tokens"] += output_tokens
+            language_plan["seconds"] += PLAN_REQUEST_SECONDS + output_tokens / PLAN_OUTPUT_TOKENS_PER_SECOND
+            limiter_tokens += estimated_tokens
+        language_plan["cost_usd"] = round(estimate_cost(MODEL_NAME, language_plan["input_tokens"], language_plan["output_tokens"]), 6)
+        language_plan["seconds"] = round(language_plan["seconds"], 3)
+        language_plans[language_mapping[language]] = language_plan
+
+    # Languages run MAX_CONCURRENT_LANGUAGES at a time in submission order, each sending its requests one after another.
+    # The rate limiter starts with a full minute of budget, so it only slows down runs that need more than that.
+    workers = [0.0] * max(1, min(MAX_CONCURRENT_LANGUAGES, len(language_plans)))
+    for language_plan in language_plans.values():
+        workers[workers.index(min(workers))] += language_plan["seconds"]
+    requests = sum(language_plan["requests"] for language_plan in language_plans.values())
+    rate_limited_seconds = 60 * max(0, (requests - REQUESTS_PER_MINUTE) / REQUESTS_PER_MINUTE, (limiter_tokens - TOKENS_PER_MINUTE) / TOKENS_PER_MINUTE)
+
+    totals = {
+        "work_items": len(items),
+        "cached_items": sum(item["cached"] for item in items),
+        "texts": sum(language_plan["texts"] for language_plan in language_plans.values()),
+        "requests": requests,
+        "input_tokens": sum(language_plan["input_tokens"] for language_plan in language_plans.values()),
+        "output_tokens": sum(language_plan["output_tokens"] for language_plan in language_plans.values()),
+        "cost_usd": round(sum(language_plan["cost_usd"] for language_plan in language_plans.values()), 6),
+        "wall_seconds": round(max(max(workers), rate_limited_seconds), 1),
+        "files_with_removals": len(removals_by_file),
+    }
+    plan = {
+        "config": {
+            "model": MODEL_NAME,
+            "protocol": TRANSLATION_PROTOCOL,
+            "tokenizer": tokenizer_name,
+            "chunk_token_budget": CHUNK_TOKEN_BUDGET,
+            "concurrent_languages": MAX_CONCURRENT_LANGUAGES,
+            "requests_per_minute": REQUESTS_PER_MINUTE,
+            "tokens_per_minute": TOKENS_PER_MINUTE,
+        },
+        "totals": totals,
+        "languages": language_plans,
+        "items": items,
+    }
+
+    if output_format == "json":
+        report = json.dumps(plan, indent=2, ensure_ascii=False)
+    else:
+        lines = []
+        if show_items:
+            lines.extend(f"{item['language']}\t{item['file']}\t{item['key']}" + ("\t(translation memory)" if item["cached"] else "") for item in items)
+        lines.extend(
+            f"  {code}: {language_plan['requests']} requests, ~{language_plan['input_tokens']} input and ~{language_plan['output_tokens']} output tokens, "
+            f"~{language_plan['seconds']:.0f}s, ${language_plan['cost_usd']:.4f}"
+            for code, language_plan in language_plans.items()
+        )
+        lines.append(
+            f"{totals['work_items']} work items in {len({item['language'] for item in items})} languages, "
+            f"{totals['cached_items']} from the translation memory; {totals['files_with_removals']} files with removed keys."
+        )
+        lines.append(
+            f"{totals['texts']} distinct texts need {totals['requests']} requests ({CHUNK_TOKEN_BUDGET}-token batches, {TRANSLATION_PROTOCOL} protocol): "
+            f"~{totals['input_tokens']} input and ~{totals['output_tokens']} output tokens ({tokenizer_name} tokenizer), "
+            f"estimated cost ${totals['cost_usd']:.4f} with {MODEL_NAME}."
+        )
+        lines.append(f"Projected wall time: ~{totals['wall_seconds']}s with {MAX_CONCURRENT_LANGUAGES} concurrent languages.")
+        report = "\n".join(lines)
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write(report + "\n")
+        print(f"Wrote the plan to {output_path}.")
+    else:
+        print(report)
+    return plan
+
+
+# Check every localized RESX file against the neutral ones and report the issues as JSON or text.
+# Returns the issues found.
+def verify_translations(languages=None, files=None, output_format="text", output_path=None, max_workers=None):
+    base_dir = "../"
+    languages = language_mapping if languages is None else languages
+    files = resource_files if files is None else files
+    source_values = {
+        resource_file: read_resx_values(os.path.join(base_dir, f"{resource_file}.resx"), keys)
+        for resource_file, keys in files.items()
+    }
+    key_source = "key discovery" if KEY_DISCOVERY else "the resource_files lists in translate.py"
+    issues = verify_localized_files(base_dir, source_values, languages.values(), load_manifest(), max_workers, files, key_source)
+    summary = summarize_issues(issues)
+
+    if output_format == "json":
+        report = json.dumps({"summary": summary, "issues": issues}, indent=2, ensure_ascii=False)
+    else:
+        lines = [f"{issue['file']}.{issue['language']}.resx: [{issue['issue']}] {issue['key']}: {issue['detail']}" for issue in issues]
+        lines.append(f"{len(issues)} issues found" + (f": {summary}" if summary else "."))
+        report = "\n".join(lines)
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write(report + "\n")
+        print(f"Wrote {len(issues)} issues to {output_path}.")
+    else:
+        print(report)
+    return issues
+
+
+# Remove the translations of keys that were dropped from or changed in the neutral RESX files, rewriting each
+# localized file once, and forget them in the manifest so the next translate run requests them again.
+# Returns {(resource_file, code): removed keys}.
+def prune_translations(languages=None, files=None, dry_run=False):
+    base_dir = "../"
+    languages = language_mapping if languages is None else languages
+    files = resource_files if files is None else files
+    source_values = {
+        resource_file: read_resx_values(os.path.join(base_dir, f"{resource_file}.resx"), keys)
+        for resource_file, keys in files.items()
+    }
+    manifest = load_manifest()
+    pruned = prune_localized_resx_files(base_dir, source_values, manifest, list(languages.values()), dry_run)
+    if pruned and not dry_run:
+        save_manifest(manifest)
+    return pruned
+
+
+# Write a pseudo-localized RESX file for every resource file without any requests: accented, padded by
+# padding_percent and bracketed text, mirrored right-to-left with mirror=True. Returns the code of the pseudo-locale.
+def generate_pseudo_locale(padding_percent=30, mirror=False, files=None):
+    base_dir = "../"
+    files = resource_files if files is None else files
+    code = MIRRORED_PSEUDO_LOCALE if mirror else PSEUDO_LOCALE
+
+    translations_by_file = {}
+    removals_by_file = {}
+    for resource_file, keys in files.items():
+        values = read_resx_values(os.path.join(base_dir, f"{resource_file}.resx"), keys)
+        translations_by_file[(resource_file, code)] = {
+            key: pseudo_localize(value, padding_percent / 100, mirror) for key, value in values.items()
+        }
+        # Keys that are no longer translated would otherwise linger in the pseudo-localized file
+        pseudo_file_path = os.path.join(base_dir, f"{resource_file}.{code}.resx")
+        if os.path.exists(pseudo_file_path):
+            removals_by_file[(resource_file, code)] = [key for key in read_resx_values(pseudo_file_path) if key not in values]
+
+    write_translations(translations_by_file, base_dir, removals_by_file)
+    return code
+
+
+# Replace the listed keys of every resource file with the ones the C# code actually references.
+# Resource files whose neutral RESX can't be found keep their listed keys. update_index=False only reads KEY_INDEX_PATH.
+def apply_key_discovery(update_index=True):
+    global resource_files
+    used = discover_keys(build_key_index("../", KEY_INDEX_PATH, update_cache=update_index))
+    resource_files = {
+        resource_file: used.get(resource_file, keys)
+        for resource_file, keys in resource_files.items()
+    }
+
+
+# Compare the listed keys with the ones the C# code references, so dead keys can be dropped and new ones added.
+# Returns the report ({resource_file: {"unused": [...], "unlisted": [...], "unreferenced": [...]}}).
+def report_keys(output_format="text", output_path=None):
+    index = build_key_index("../", KEY_INDEX_PATH)
+    report = compare_with_listed_keys(index, discover_keys(index), resource_files)
+
+    if output_format == "json":
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+    else:
+        lines = []
+        for resource_file, groups in report.items():
+            lines.append(
+                f"{resource_file}.resx: {len(groups['unused'])} listed keys unused, {len(groups['unlisted'])} used keys not listed, "
+                f"{len(groups['unreferenced'])} translatable keys never referenced."
+            )
+            for group, label in (("unused", "unused"), ("unlisted", "not listed"), ("unreferenced", "never referenced")):
+                lines.extend(f"  [{label}] {key}" for key in groups[group])
+        unused = sum(len(groups["unused"]) for groups in report.values())
+        lines.append(f"{unused} listed keys are not used and cost {unused * len(language_mapping)} translations per full run.")
+        output = "\n".join(lines)
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+        print(f"Wrote the key report to {output_path}.")
+    else:
+        print(output)
+    return report
+
+
+# Read the {key: source-text hash} map of every selected neutral RESX file
+def read_source_hashes(base_dir="../", files=None):
+    files = resource_files if files is None else files
+    return {
+        resource_file: {key: hash_text(value) for key, value in read_resx_values(os.path.join(base_dir, f"{resource_file}.resx"), keys).items()}
+        for resource_file, keys in files.items()
+    }
+
+
+# Watch the neutral RESX files (and, with KEY_DISCOVERY, the C# sources) until interrupted, and translate the keys
+# that changed since the last snapshot into every selected language. A burst of saves is debounced into one run,
+# and edits made while a run is in progress are coalesced into the next one.
+def watch_translations(languages=None, files=None, offline=False, interval=0.5, debounce=1.5):
+    base_dir = "../"
+    watched_files = resource_files if files is None else files
+    watched_names = {f"{resource_file}.resx" for resource_file in watched_files}
+    watcher = FileWatcher(base_dir, lambda name: name in watched_names or (KEY_DISCOVERY and name.endswith(".cs")), interval)
+    snapshot = read_source_hashes(base_dir, {resource_file: resource_files[resource_file] for resource_file in watched_files})
+    print(f"Watching {len(watched_names)} resource files for changes; press Ctrl+C to stop.")
+
+    try:
+        while True:
+            changed_names = watcher.wait_for_changes(debounce)
+            if KEY_DISCOVERY and any(name.endswith(".cs") for name in changed_names):
+                apply_key_discovery()
+            try:
+                current = read_source_hashes(base_dir, {resource_file: resource_files[resource_file] for resource_file in watched_files})
+            except ET.ParseError as e:
+                # Most likely a half-saved file; the next save triggers another attempt
+                print(f"Skipping changes that can't be parsed yet: {e}")
+                continue
+
+            changed_keys = {}
+            for resource_file, hashes in current.items():
+                added, changed, removed = compute_key_delta(snapshot.get(resource_file, {}), hashes)
+                if added or changed or removed:
+                    changed_keys[resource_file] = added + changed + removed
+                    print(f"{resource_file}.resx: {len(added)} keys added, {len(changed)} changed, {len(removed)} removed.")
+            if not changed_keys:
+                continue
+
+            generate_resx_files(
+                offline=offline,
+                languages=languages,
+                files={resource_file: resource_files[resource_file] for resource_file in changed_keys},
+                keys={key for keys in changed_keys.values() for key in keys},
+            )
+            add_resx_to_csproj()
+            snapshot = current
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+# Turn a JSON verify report into {(resource_file, code): {"retranslate": keys, "remove": keys}} for generate_resx_files
+def load_repairs(report_path):
+    with open(report_path, encoding="utf-8") as report_file:
+        issues = json.load(report_file)["issues"]
+
+    repairs = {}
+    for issue in issues:
+        if issue["key"] is None:
+            continue
+        repair = repairs.setdefault((issue["file"], issue["language"]), {"retranslate": set(), "remove": set()})
+        if issue["issue"] in RETRANSLATABLE_ISSUES:
+            repair["retranslate"].add(issue["key"])
+        elif issue["issue"] == "extra_key":
+            repair["remove"].add(issue["key"])
+    return repairs
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Running the script without a command translates everything, as before
+    if not argv:
+        argv = ["translate"]
+
+    parser = argparse.ArgumentParser(description="Translate and maintain the TextCraft RESX files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_scope_arguments(subparser, keys=True):
+        subparser.add_argument("--languages", nargs="+", metavar="LANGUAGE", help="language codes or names to process (default: all)")
+        subparser.add_argument("--files", nargs="+", metavar="FILE", help="resource files to process, e.g. Forge (default: all)")
+        if keys:
+            subparser.add_argument("--keys", nargs="+", metavar="KEY", help="exact resource keys to process (default: all)")
+
+    translate_parser = subparsers.add_parser("translate", help="translate added and changed keys and update the localized RESX files")
+    add_scope_arguments(translate_parser)
+    translate_parser.add_argument("--force", action="store_true", help="retranslate the selected keys even if they are up to date, bypassing the translation memory")
+    translate_parser.add_argument("--offline", action="store_true", help="only use the translation memory and never send requests")
+    translate_parser.add_argument("--repair", metavar="REPORT", help="only fix the issues listed in a JSON verify report")
+    translate_parser.add_argument("--resume", action="store_true", help="continue an interrupted run, skipping the files it already finished")
+
+    sync_parser = subparsers.add_parser("sync-csproj", help="add and remove the localized RESX files in TextCraft.csproj")
+    sync_parser.add_argument("--dry-run", action="store_true", help="only print what would change")
+
+    prune_parser = subparsers.add_parser("prune", help="remove outdated translations from the localized RESX files")
+    add_scope_arguments(prune_parser, keys=False)
+    prune_parser.add_argument("--dry-run", action="store_true", help="only print what would be removed")
+    prune_parser.add_argument("--whole-files", action="store_true", help="delete the localized files entirely instead of pruning entries")
+
+    status_parser = subparsers.add_parser("status", help="show pending translations without sending requests")
+    add_scope_arguments(status_parser)
+
+    verify_parser = subparsers.add_parser("verify", help="check the localized RESX files against the neutral ones")
+    add_scope_arguments(verify_parser, keys=False)
+    verify_parser.add_argument("--format", choices=["text", "json"], default="text", help="report format")
+    verify_parser.add_argument("--output", metavar="PATH", help="write the report to a file instead of stdout")
+    verify_parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+
+    plan_parser = subparsers.add_parser("plan", help="estimate the requests, tokens, cost and wall time of a translate run without sending anything")
+    add_scope_arguments(plan_parser)
+    plan_parser.add_argument("--force", action="store_true", help="plan a forced run that retranslates the selected keys")
+    plan_parser.add_argument("--format", choices=["text", "json"], default="text", help="report format")
+    plan_parser.add_argument("--output", metavar="PATH", help="write the plan to a file instead of stdout")
+    plan_parser.add_argument("--no-items", action="store_true", help="only print the per-language estimates and totals")
+
+    pseudo_parser = subparsers.add_parser("pseudo", help=f"write a pseudo-localized {PSEUDO_LOCALE} locale for layout testing, without any requests")
+    add_scope_arguments(pseudo_parser, keys=False)
+    pseudo_parser.add_argument("--padding", type=int, default=30, metavar="PERCENT", help="how much longer the pseudo-translations are (default: 30)")
+    pseudo_parser.add_argument("--mirror", action="store_true", help=f"render the text right-to-left and write {MIRRORED_PSEUDO_LOCALE} instead")
+    pseudo_parser.add_argument("--clean", action="store_true", help="delete the pseudo-localized files instead")
+    pseudo_parser.add_argument("--csproj", action="store_true", help="also embed the pseudo-locales in TextCraft.csproj to run the add-in with them (don't commit that change)")
+
+    watch_parser = subparsers.add_parser("watch", help="translate changed keys whenever the neutral RESX files are saved")
+    add_scope_arguments(watch_parser, keys=False)
+    watch_parser.add_argument("--offline", action="store_true", help="only use the translation memory and never send requests")
+    watch_parser.add_argument("--interval", type=float, default=0.5, metavar="SECONDS", help="how often to check the files (default: 0.5)")
+    watch_parser.add_argument("--debounce", type=float, default=1.5, metavar="SECONDS", help="how long the files must stay unchanged before translating (default: 1.5)")
+
+    keys_parser = subparsers.add_parser("keys", help="report listed keys the C# code doesn't use, and used keys that aren't listed")
+    keys_parser.add_argument("--format", choices=["text", "json"], default="text", help="report format")
+    keys_parser.add_argument("--output", metavar="PATH", help="write the report to a file instead of stdout")
+
+    subparsers.add_parser("seed-cache", help="seed the translation memory and manifest from the existing localized RESX files")
+
+    batch_requests_parser = subparsers.add_parser("batch-requests", help="write the missing translations as an OpenAI Batch API JSONL file")
+    batch_requests_parser.add_argument("path", help="the requests file to write")
+    add_scope_arguments(batch_requests_parser)
+
+    batch_results_parser = subparsers.add_parser("batch-results", help="ingest an OpenAI Batch API results JSONL file and update the RESX files")
+    batch_results_parser.add_argument("path", help="the results file to ingest")
+    batch_results_parser.add_argument("--requests", metavar="PATH", default="batch_requests.jsonl", help="the requests file the results belong to")
+
+    args = parser.parse_args(argv)
+    # The key report compares the discovered keys with the listed ones, so it needs the lists untouched
+    if KEY_DISCOVERY and args.command != "keys":
+        # status and plan only estimate a run, so they leave every state file as it is
+        apply_key_discovery(update_index=args.command not in ("status", "plan"))
+    try:
+        languages = resolve_languages(args.languages) if getattr(args, "languages", None) else None
+        files = resolve_resource_files(args.files) if getattr(args, "files", None) else None
+    except ValueError as e:
+        parser.error(str(e))
+    keys = set(args.keys) if getattr(args, "keys", None) else None
+
+    if args.command == "translate":
+        repairs = load_repairs(args.repair) if args.repair else None
+        # Only new localized files need to be added to the project
+        if generate_resx_files(offline=args.offline, languages=languages, files=files, keys=keys, force=args.force, repairs=repairs, resume=args.resume):
+            add_resx_to_csproj()
+    elif args.command == "sync-csproj":
+        add_resx_to_csproj(dry_run=args.dry_run)
+    elif args.command == "prune":
+        if args.whole_files:
+            codes = list(languages.values()) if languages else None
+            delete_all_localized_resx_files("../", files or resource_files, codes, dry_run=args.dry_run)
+            if not args.dry_run:
+                add_resx_to_csproj()
+        else:
+            prune_translations(languages=languages, files=files, dry_run=args.dry_run)
+    elif args.command == "status":
+        print_status(languages=languages, files=files, keys=keys)
+    elif args.command == "verify":
+        if verify_translations(languages=languages, files=files, output_format=args.format, output_path=args.output, max_workers=args.workers):
+            return 1
+    elif args.command == "plan":
+        plan_translations(languages=languages, files=files, keys=keys, force=args.force, output_format=args.format, output_path=args.output, show_items=not args.no_items)
+    elif args.command == "pseudo":
+        if args.clean:
+            delete_all_localized_resx_files("../", files or resource_files, [PSEUDO_LOCALE, MIRRORED_PSEUDO_LOCALE])
+        else:
+            generate_pseudo_locale(padding_percent=args.padding, mirror=args.mirror, files=files)
+        # Pseudo-locale items are dropped again by any sync without --csproj
+        if args.csproj or args.clean:
+            add_resx_to_csproj(include_pseudo_locales=args.csproj and not args.clean)
+    elif args.command == "watch":
+        watch_translations(languages=languages, files=files, offline=args.offline, interval=args.interval, debounce=args.debounce)
+    elif args.command == "keys":
+        report_keys(output_format=args.format, output_path=args.output)
+    elif args.command == "seed-cache":
+        seed_translation_memory()
+    elif args.command == "batch-requests":
+        write_batch_requests(args.path, languages=languages, files=files, keys=keys)
+    elif args.command == "batch-results":
+        ingest_batch_results(args.path, args.requests)
 
 
 if __name__ == "__main__":
-    generate_resx_files()
-    add_resx_to_csproj()
\ No newline at end of file
+    sys.exit(main())
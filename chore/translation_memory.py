@@ -0,0 +1,142 @@
+import hashlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+
+def hash_text(text):
+    """
+    Returns a stable SHA-256 hex digest of the given text.
+
+    Args:
+        text (str): The text to hash.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    On-disk cache of previous translations stored in SQLite.
+
+    Entries are keyed by the hash of the source text, the target language code, the model name and the
+    hash of the system prompt, so changing the model or the prompt never returns stale translations.
+
+    One instance can be shared by the translation workers; its statements are serialized by a lock.
+
+    Args:
+        path (str): The SQLite database file.
+        read_only (bool): Open the database without ever writing to it. A missing file is not created; the
+            translation memory is empty instead.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        if read_only and os.path.exists(path):
+            self.connection = sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            return
+        self.connection = sqlite3.connect(":memory:" if read_only else path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                source_hash TEXT NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                source_text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source_hash, language, model, prompt_hash)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def _query(self, sql, parameters=()):
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def get_many(self, source_texts, language, model, prompt_hash):
+        """
+        Looks up the cached translations for several source texts at once.
+
+        Args:
+            source_texts (Iterable[str]): The source texts to look up.
+            language (str): The target language code (e.g. "ja").
+            model (str): The model name the translations were produced with.
+            prompt_hash (str): The hash of the system prompt the translations were produced with.
+
+        Returns:
+            dict[str, str]: The cached translation for every source text that was found.
+        """
+        hashes = {hash_text(text): text for text in source_texts}
+        found = {}
+        hash_list = list(hashes)
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(hash_list), 500):
+            chunk = hash_list[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._query(
+                f"SELECT source_hash, translation FROM translations "
+                f"WHERE language = ? AND model = ? AND prompt_hash = ? AND source_hash IN ({placeholders})",
+                [language, model, prompt_hash, *chunk],
+            )
+            for source_hash, translation in rows:
+                found[hashes[source_hash]] = translation
+        return found
+
+    def put_many(self, entries, language, model, prompt_hash):
+        """
+        Stores several translations for one language, replacing any previous value.
+
+        Args:
+            entries (Iterable[tuple[str, str]]): Pairs of (source text, translation).
+            language (str): The target language code (e.g. "ja").
+            model (str): The model name the translations were produced with.
+            prompt_hash (str): The hash of the system prompt the translations were produced with.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(source_hash, language, model, prompt_hash, source_text, translation, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (hash_text(source), language, model, prompt_hash, source, translation, now)
+                    for source, translation in entries
+                ],
+            )
+
+    def source_texts(self, model, prompt_hash, after_rowid=0):
+        """
+        Args:
+            model (str): The model name the translations were produced with.
+            prompt_hash (str): The hash of the system prompt the translations were produced with.
+            after_rowid (int): Only return the texts of rows stored after the one with this ID (see last_rowid).
+
+        Returns:
+            list[str]: The distinct source texts translated into any language with the given model and system prompt.
+        """
+        rows = self._query(
+            "SELECT DISTINCT source_text FROM translations WHERE model = ? AND prompt_hash = ? AND rowid > ?",
+            [model, prompt_hash, after_rowid],
+        )
+        return [source_text for source_text, in rows]
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM translations")[0][0]
+
+    def last_rowid(self):
+        """
+        Returns:
+            int: The highest row ID, or 0 when empty. Rows are never deleted, so the source texts stored after this
+                call are those of the rows with higher IDs.
+        """
+        return self._query("SELECT COALESCE(MAX(rowid), 0) FROM translations")[0][0]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,43 @@
+import re
+
+# Serbian Cyrillic to Gaj's Latin alphabet; the three digraph letters are handled separately to get their case right
+SERBIAN_CYRILLIC_TO_LATIN = str.maketrans({
+    "А": "A", "Б": "B", "В": "V", "Г": "G", "Д": "D", "Ђ": "Đ", "Е": "E", "Ж": "Ž", "З": "Z", "И": "I",
+    "Ј": "J", "К": "K", "Л": "L", "М": "M", "Н": "N", "О": "O", "П": "P", "Р": "R", "С": "S", "Т": "T",
+    "Ћ": "Ć", "У": "U", "Ф": "F", "Х": "H", "Ц": "C", "Ч": "Č", "Ш": "Š",
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "ђ": "đ", "е": "e", "ж": "ž", "з": "z", "и": "i",
+    "ј": "j", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "ћ": "ć", "у": "u", "ф": "f", "х": "h", "ц": "c", "ч": "č", "ш": "š",
+    "љ": "lj", "њ": "nj", "џ": "dž",
+})
+SERBIAN_CYRILLIC_DIGRAPHS = {"Љ": "Lj", "Њ": "Nj", "Џ": "Dž"}
+SERBIAN_UPPERCASE_DIGRAPH_PATTERN = re.compile(r"[ЉЊЏ]")
+
+
+def serbian_cyrillic_to_latin(text):
+    """
+    Transliterates Serbian from the Cyrillic to the Latin script, e.g. "Љубав ЊЕГОШ" -> "Ljubav NJEGOŠ".
+
+    Anything that isn't Serbian Cyrillic, such as placeholders and access-key markers, is left as is.
+
+    Args:
+        text (str): The Cyrillic text.
+
+    Returns:
+        str: The Latin text.
+    """
+    def replace_digraph(match):
+        # Inside an all-caps word the digraph is all caps as well
+        following = text[match.end():match.end() + 1]
+        preceding = text[match.start() - 1:match.start()]
+        if following.isupper() or (not following.isalpha() and preceding.isupper()):
+            return SERBIAN_CYRILLIC_DIGRAPHS[match.group(0)].upper()
+        return SERBIAN_CYRILLIC_DIGRAPHS[match.group(0)]
+
+    return SERBIAN_UPPERCASE_DIGRAPH_PATTERN.sub(replace_digraph, text).translate(SERBIAN_CYRILLIC_TO_LATIN)
+
+
+# (source code, target code) -> function converting a translation between the scripts of one language
+TRANSLITERATIONS = {
+    ("sr-Cyrl", "sr-Latn"): serbian_cyrillic_to_latin,
+}
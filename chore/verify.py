@@ -0,0 +1,137 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from translation_memory import hash_text
+
+# .NET composite format items such as {0}, {1:N2} or {0,-10}
+PLACEHOLDER_PATTERN = re.compile(r"\{(\d+)(?:[,:][^{}]*)?\}")
+
+# Issues that a retranslation can fix, as opposed to extra keys that have to be removed
+RETRANSLATABLE_ISSUES = {"missing_key", "stale", "empty", "placeholders", "newlines"}
+
+
+def find_placeholders(text):
+    """
+    Returns the sorted indexes of the format placeholders in a text, e.g. [0, 0, 1] for "{0} {1} {0}".
+    """
+    return sorted(int(index) for index in PLACEHOLDER_PATTERN.findall(text))
+
+
+def check_translation(source, translation):
+    """
+    Compares a translation with its source text.
+
+    Args:
+        source (str): The neutral text.
+        translation (str | None): The localized text.
+
+    Returns:
+        list[tuple[str, str]]: One (issue, detail) pair per problem found.
+    """
+    if translation is None or not translation.strip():
+        return [("empty", "the translation is empty")]
+
+    issues = []
+    source_placeholders = find_placeholders(source)
+    translated_placeholders = find_placeholders(translation)
+    if source_placeholders != translated_placeholders:
+        issues.append(("placeholders", f"expected {source_placeholders}, found {translated_placeholders}"))
+
+    # Multi-line prompts must keep their line structure
+    if "\n" in source and source.count("\n") != translation.count("\n"):
+        issues.append(("newlines", f"expected {source.count(chr(10)) + 1} lines, found {translation.count(chr(10)) + 1}"))
+    return issues
+
+
+def check_localized_file(task):
+    """
+    Checks one localized RESX file against its neutral values. Runs in a worker process.
+
+    Args:
+        task (tuple): (base_dir, resource_file, code, source_values, manifest_hashes, active_keys, key_source),
+            where source_values maps every translatable key to its neutral text, manifest_hashes maps keys to the
+            source-text hash they were last translated from, active_keys are the keys selected for translation
+            and key_source names where that selection came from.
+
+    Returns:
+        list[dict]: The issues found.
+    """
+    base_dir, resource_file, code, source_values, manifest_hashes, active_keys, key_source = task
+    path = os.path.join(base_dir, f"{resource_file}.{code}.resx")
+
+    def issue(key, kind, detail):
+        return {"file": resource_file, "language": code, "key": key, "issue": kind, "detail": detail}
+
+    if not os.path.exists(path):
+        return [issue(key, "missing_key", "the localized file does not exist") for key in source_values]
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError as e:
+        return [issue(None, "parse_error", str(e))]
+
+    translations = {}
+    for data in root.findall("data"):
+        value = data.find("value")
+        translations[data.attrib.get("name")] = value.text if value is not None else None
+
+    issues = []
+    for key, source in source_values.items():
+        if key not in translations:
+            issues.append(issue(key, "missing_key", "the key is not in the localized file"))
+            continue
+        if key in manifest_hashes and manifest_hashes[key] != hash_text(source):
+            issues.append(issue(key, "stale", "the neutral text changed after this translation"))
+        for kind, detail in check_translation(source, translations[key]):
+            issues.append(issue(key, kind, detail))
+
+    for key in translations:
+        if key in source_values:
+            continue
+        if key in active_keys:
+            issues.append(issue(key, "extra_key", "the key is in the active key list but has no translatable text in the neutral file"))
+        else:
+            issues.append(issue(key, "extra_key", f"the key is not in the active key list ({key_source})"))
+    return issues
+
+
+def verify_localized_files(base_dir, source_values, language_codes, manifest, max_workers=None, active_keys=None, key_source="the listed keys"):
+    """
+    Checks every localized RESX file in a process pool.
+
+    Args:
+        base_dir (str): The directory containing the RESX files.
+        source_values (Mapping[str, Mapping[str, str]]): Resource file -> translatable key -> neutral text.
+        language_codes (Iterable[str]): The language codes to check.
+        manifest (Mapping): The translation manifest (resource file -> code -> key -> source-text hash).
+        max_workers (int | None): The number of worker processes.
+        active_keys (Mapping[str, Iterable[str]] | None): Resource file -> keys selected for translation, which may
+            include keys without translatable text; the keys of source_values when None.
+        key_source (str): Where the active keys came from (e.g. "key discovery"), named in extra_key details.
+
+    Returns:
+        list[dict]: The issues found, ordered by file and language.
+    """
+    active_keys = source_values if active_keys is None else active_keys
+    tasks = [
+        (base_dir, resource_file, code, values, manifest.get(resource_file, {}).get(code, {}), set(active_keys.get(resource_file, values)), key_source)
+        for resource_file, values in source_values.items()
+        for code in language_codes
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(check_localized_file, tasks, chunksize=max(1, len(tasks) // (4 * (os.cpu_count() or 1))))
+        return [issue for file_issues in results for issue in file_issues]
+
+
+def summarize_issues(issues):
+    """
+    Counts the issues per kind.
+
+    Returns:
+        dict[str, int]: The number of issues of every kind.
+    """
+    summary = {}
+    for issue in issues:
+        summary[issue["issue"]] = summary.get(issue["issue"], 0) + 1
+    return summary
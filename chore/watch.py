@@ -0,0 +1,61 @@
+import os
+import time
+
+
+class FileWatcher:
+    """
+    Polls the files of a directory for changes by modification time and size.
+
+    Polling needs no platform-specific APIs and is cheap for the handful of files watched here.
+
+    Args:
+        directory (str): The directory to watch.
+        predicate (Callable[[str], bool]): Selects the file names to watch.
+        interval (float): Seconds between polls.
+    """
+
+    def __init__(self, directory, predicate, interval=0.5):
+        self.directory = directory
+        self.predicate = predicate
+        self.interval = interval
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        """
+        Returns:
+            dict[str, tuple[int, int]]: File name -> (modification time in ns, size) of every watched file.
+        """
+        state = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if self.predicate(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    state[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def wait_for_changes(self, debounce=1.5):
+        """
+        Blocks until watched files change and then stay unchanged for `debounce` seconds, so a burst of saves
+        is reported once.
+
+        Returns:
+            set[str]: The names of the files that were added, changed or deleted since the last call.
+        """
+        while True:
+            time.sleep(self.interval)
+            current = self.snapshot()
+            if current == self.state:
+                continue
+
+            quiet_since = time.monotonic()
+            while time.monotonic() - quiet_since < debounce:
+                time.sleep(self.interval)
+                latest = self.snapshot()
+                if latest != current:
+                    current = latest
+                    quiet_since = time.monotonic()
+
+            changed = {name for name in self.state.keys() | current.keys() if self.state.get(name) != current.get(name)}
+            self.state = current
+            if changed:
+                return changed